@@ -0,0 +1,82 @@
+from events import SliceEvent, ComboEvent, BombEvent, WeatherEvent, GameOverEvent
+from weather import WEATHER_STATES
+
+COMBO_MASTER_STREAK = 5  # 连击大师需要的连击数
+SCORE_ACHIEVEMENT = 100
+
+
+# 成就：订阅事件总线，每帧处理一批事件，有变化时才保存存档
+class AchievementTracker:
+    def __init__(self, game, bus):
+        self.game = game
+        bus.subscribe(SliceEvent, self.on_slices)
+        bus.subscribe(ComboEvent, self.on_combos)
+        bus.subscribe(WeatherEvent, self.on_weather)
+        bus.subscribe(GameOverEvent, self.on_game_over)
+
+    def unlock(self, name):
+        achievements = self.game.achievements
+        if achievements.get(name):
+            return False
+        achievements[name] = True
+        return True
+
+    def on_slices(self, events):
+        changed = self.unlock("first_slice")
+        if max(event.score for event in events) >= SCORE_ACHIEVEMENT and self.unlock("100_score"):
+            self.game.unlock_skin("watermelon", "frost")
+            changed = True
+        if changed:
+            self.game.save_profile()
+
+    def on_combos(self, events):
+        game = self.game
+        streak = max(event.streak for event in events)
+        changed = streak >= COMBO_MASTER_STREAK and self.unlock("combo_master")
+        game.highest_combo = max(game.highest_combo, streak)
+        if streak > game.best_combo:
+            game.best_combo = streak
+            changed = True
+        if changed:
+            game.save_profile()
+
+    def on_weather(self, events):
+        history = self.game.achievements.setdefault("weather_history", [])
+        changed = False
+        for event in events:
+            for weather in (event.old, event.new):
+                if weather not in history:
+                    history.append(weather)
+                    changed = True
+        if len(history) == len(WEATHER_STATES):
+            changed = self.unlock("all_weather") or changed
+        if changed:
+            self.game.save_profile()
+
+    def on_game_over(self, events):
+        if any(event.difficulty == "hard" for event in events) and self.unlock("hard_mode"):
+            self.game.save_profile()
+
+
+# 本局统计：各类事件计数（每局开始时清零）
+class SessionStats:
+    def __init__(self, bus):
+        self.reset()
+        bus.subscribe(SliceEvent, self.on_slices)
+        bus.subscribe(ComboEvent, self.on_combos)
+        bus.subscribe(BombEvent, self.on_bombs)
+
+    def reset(self):
+        self.slices = {}  # 水果类型 -> 切中次数
+        self.combos = 0
+        self.bombs = 0
+
+    def on_slices(self, events):
+        for event in events:
+            self.slices[event.fruit_type] = self.slices.get(event.fruit_type, 0) + 1
+
+    def on_combos(self, events):
+        self.combos += len(events)
+
+    def on_bombs(self, events):
+        self.bombs += len(events)
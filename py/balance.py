@@ -0,0 +1,178 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import time
+
+# 无界面运行（必须在导入 fruit6 之前设置）
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+# 参数化的脚本玩家：对每个出现的物体只做一次决策，经过反应时间后出刀
+class ScriptedPlayer:
+    def __init__(self, hit_rate=0.9, reaction_ticks=12, bomb_avoid=0.98, seed=None):
+        """
+        hit_rate: 成功切到水果的概率
+        reaction_ticks: 物体进入屏幕后多少帧才出刀
+        bomb_avoid: 避开炸弹的概率（否则会误切炸弹）
+        """
+        self.hit_rate = hit_rate
+        self.reaction_ticks = reaction_ticks
+        self.bomb_avoid = bomb_avoid
+        self.rng = random.Random(seed)
+        self.plans = {}  # id(物体) -> (出刀帧, 是否出刀)
+
+    def step(self, game, window_height):
+        """每帧调用一次，按计划对到期的物体出刀"""
+        plans = {}
+        for obj in game.fruits:
+            if not obj.sliced:
+                self.act(game, obj, plans, self.hit_rate, window_height)
+        for obj in game.bombs:
+            self.act(game, obj, plans, 1.0 - self.bomb_avoid, window_height)
+        self.plans = plans
+
+    def act(self, game, obj, plans, chance, window_height):
+        if obj.y > window_height:
+            return  # 还没进入屏幕
+        plan = self.plans.get(id(obj))
+        if plan is None:
+            plan = (game.tick + self.reaction_ticks, self.rng.random() < chance)
+        if plan[1] and game.tick >= plan[0]:
+            # 以物体为中心横切一刀
+            game.process_slice((obj.x - 10, obj.y), (obj.x + 10, obj.y))
+            plan = (plan[0], False)
+        plans[id(obj)] = plan
+
+
+_game = None
+
+
+def init_worker():
+    """工作进程初始化：每个进程只创建一次 Game，避免重复加载资源"""
+    global _game
+    import fruit6
+    _game = fruit6.Game()
+    # 预热对象池，保证开局的水果不会在对局中途才创建（创建时会消耗全局随机数，影响复现）
+    for pool in _game.fruit_pools.values():
+        objects = [pool.acquire() for _ in range(3)]
+        for obj in objects:
+            pool.release(obj)
+
+
+def run_session(job):
+    """运行一局无界面游戏，返回统计结果"""
+    import fruit6
+    difficulty, seed, player_params, overrides, max_ticks = job
+    random.seed(seed)
+    game = _game
+    game.seed = seed
+    game.spawn_overrides = overrides
+    game.difficulty = difficulty
+    game.reset_game()
+    game.current_screen = "game"
+    player = ScriptedPlayer(seed=seed, **player_params)
+
+    cause = "timeout"
+    while game.tick < max_ticks:
+        player.step(game, fruit6.WINDOW_HEIGHT)
+        game.update()
+        if game.game_over:
+            cause = "lives" if game.lives <= 0 else "bomb"
+            break
+
+    return {
+        "difficulty": difficulty,
+        "hit_rate": player_params["hit_rate"],
+        "seed": seed,
+        "survival_seconds": game.tick / fruit6.FPS,
+        "score": game.score,
+        "level": game.level,
+        "lives_lost": 3 - max(game.lives, 0),
+        "cause": cause,
+    }
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(results):
+    """按（难度, 命中率）汇总"""
+    groups = {}
+    for result in results:
+        groups.setdefault((result["difficulty"], result["hit_rate"]), []).append(result)
+
+    lines = []
+    for (difficulty, hit_rate), group in sorted(groups.items()):
+        survival = [r["survival_seconds"] for r in group]
+        scores = [r["score"] for r in group]
+        levels = [r["level"] for r in group]
+        causes = {}
+        for r in group:
+            causes[r["cause"]] = causes.get(r["cause"], 0) + 1
+        lines.append(
+            f"{difficulty:6s} 命中率={hit_rate:.2f} 局数={len(group):5d} | "
+            f"存活秒数 均值={statistics.mean(survival):6.1f} 中位={statistics.median(survival):6.1f} "
+            f"P90={percentile(survival, 0.9):6.1f} | "
+            f"分数 均值={statistics.mean(scores):6.1f} P10={percentile(scores, 0.1):4d} "
+            f"P90={percentile(scores, 0.9):4d} 最高={max(scores):4d} | "
+            f"等级 均值={statistics.mean(levels):5.1f} 最高={max(levels):3d} | "
+            f"失去生命 均值={statistics.mean(r['lives_lost'] for r in group):4.2f} | 结束原因 {causes}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多进程蒙特卡洛平衡性测试")
+    parser.add_argument("--sessions", type=int, default=200, help="每种配置运行的局数")
+    parser.add_argument("--difficulty", nargs="+", default=["easy", "medium", "hard"])
+    parser.add_argument("--hit-rate", type=float, nargs="+", default=[0.9], help="脚本玩家命中率（可多个）")
+    parser.add_argument("--reaction", type=int, default=12, help="脚本玩家反应时间（帧）")
+    parser.add_argument("--bomb-avoid", type=float, default=0.98, help="脚本玩家避开炸弹的概率")
+    parser.add_argument("--spawn-delay", type=int, help="覆盖初始生成间隔（帧）")
+    parser.add_argument("--bomb-chance", type=float, help="覆盖炸弹概率")
+    parser.add_argument("--speed-factor", type=float, help="覆盖难度速度系数")
+    parser.add_argument("--speed-step", type=float, help="覆盖每级水果速度增量")
+    parser.add_argument("--max-seconds", type=int, default=300, help="单局最长模拟时间（秒）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0, help="起始种子")
+    parser.add_argument("--out", help="将每局结果以 JSON Lines 格式写入该文件")
+    args = parser.parse_args()
+
+    overrides = {key: value for key, value in (("spawn_delay", args.spawn_delay),
+                                               ("bomb_chance", args.bomb_chance),
+                                               ("speed_factor", args.speed_factor),
+                                               ("speed_step", args.speed_step)) if value is not None}
+    max_ticks = args.max_seconds * fruit6.FPS
+    jobs = []
+    for difficulty, hit_rate in itertools.product(args.difficulty, args.hit_rate):
+        player_params = {"hit_rate": hit_rate, "reaction_ticks": args.reaction, "bomb_avoid": args.bomb_avoid}
+        for i in range(args.sessions):
+            jobs.append((difficulty, args.seed + i, player_params, overrides, max_ticks))
+
+    results = []
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    start = time.perf_counter()
+    pool = multiprocessing.Pool(args.workers, initializer=init_worker)
+    # 结果边完成边处理，长时间运行时也能看到进度
+    for result in pool.imap_unordered(run_session, jobs, chunksize=4):
+        results.append(result)
+        if out:
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        if len(results) % 100 == 0 or len(results) == len(jobs):
+            print(f"已完成 {len(results)}/{len(jobs)} 局，用时 {time.perf_counter() - start:.1f} 秒", flush=True)
+    pool.close()
+    pool.join()
+    if out:
+        out.close()
+
+    print(summarize(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from collections import deque
+
+
+# 组合技计数器：按类型维护时间有序队列，增量淘汰过期切片
+# 插入、淘汰和查询都是均摊 O(1)，不再每帧重建列表和集合
+class ComboTracker:
+    def __init__(self, window, type_windows=None):
+        """
+        window: 切片的默认有效时长（与 now 使用同一时间单位，如帧数）
+        type_windows: 可选，为特定组合类型单独指定有效时长
+        """
+        self.window = window
+        self.type_windows = type_windows or {}
+        self.slices = {}  # 组合类型 -> 切片时间队列
+        self.total = 0  # 有效切片总数（即当前连击数）
+        self.distinct = 0  # 有效切片中不同类型的数量
+        self.best_streak = 0
+
+    def add(self, combo_type, now):
+        """记录一次切片"""
+        queue = self.slices.get(combo_type)
+        if queue is None:
+            queue = self.slices[combo_type] = deque()
+        if not queue:
+            self.distinct += 1
+        queue.append(now)
+        self.total += 1
+        if self.total > self.best_streak:
+            self.best_streak = self.total
+
+    def evict(self, now):
+        """淘汰过期的切片（每帧调用一次）"""
+        for combo_type, queue in self.slices.items():
+            if not queue:
+                continue
+            expire = now - self.type_windows.get(combo_type, self.window)
+            while queue and queue[0] <= expire:
+                queue.popleft()
+                self.total -= 1
+            if not queue:
+                self.distinct -= 1
+
+    def count(self, combo_type):
+        """某类型的有效切片数"""
+        queue = self.slices.get(combo_type)
+        return len(queue) if queue else 0
+
+    def has(self, combo_type):
+        return bool(self.slices.get(combo_type))
+
+    def clear(self):
+        self.slices.clear()
+        self.total = 0
+        self.distinct = 0
+        self.best_streak = 0
+
+    def __len__(self):
+        return self.total
@@ -0,0 +1,36 @@
+from collections import namedtuple
+
+# 游戏事件（玩法代码只负责发出事件，成就、统计等逻辑在每帧末尾统一处理）
+SliceEvent = namedtuple("SliceEvent", "tick fruit_type combo_type score")
+ComboEvent = namedtuple("ComboEvent", "tick streak effect")
+BombEvent = namedtuple("BombEvent", "tick")
+WeatherEvent = namedtuple("WeatherEvent", "tick old new")
+GameOverEvent = namedtuple("GameOverEvent", "tick cause score level difficulty")
+
+
+# 事件总线：emit 只把事件追加到本帧缓冲区，dispatch 时按类型分组一次性交给订阅者
+class EventBus:
+    def __init__(self):
+        self.buffer = []
+        self.handlers = {}  # 事件类型 -> 处理函数列表，处理函数接收本帧该类型的全部事件
+
+    def subscribe(self, event_type, handler):
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def emit(self, event):
+        self.buffer.append(event)
+
+    def dispatch(self):
+        """处理本帧缓冲的事件（每帧调用一次）"""
+        if not self.buffer:
+            return
+        events, self.buffer = self.buffer, []
+        batches = {}
+        for event in events:
+            batches.setdefault(type(event), []).append(event)
+        for event_type, batch in batches.items():
+            for handler in self.handlers.get(event_type, ()):
+                handler(batch)
+
+    def clear(self):
+        self.buffer.clear()
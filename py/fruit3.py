@@ -189,18 +189,13 @@ class Fruit:
 
         return sliced
 
-    def update(self):
-        """更新水果位置"""
+    def update(self, speed_scale=1.0, gravity_scale=1.0):
+        """更新水果位置（speed_scale / gravity_scale 为当前天气的修正，每帧由 Game 查一次后传入）"""
         if not self.sliced:
-            # 应用天气效果
-            weather_effect = self.game.get_weather_effect()
-            self.speed_y *= weather_effect["speed"]
-            self.gravity *= weather_effect["gravity"]
-
-            # 更新位置
-            self.y += self.speed_y
+            # 更新位置（天气作为本帧的修正系数，不累积修改速度和重力）
+            self.y += self.speed_y * speed_scale
             self.x += self.speed_x
-            self.speed_y += self.gravity
+            self.speed_y += self.gravity * gravity_scale
 
             # 检查是否达到折返点
             if not self.returning and self.y < WINDOW_HEIGHT / 2:  # 折返点在屏幕中间
@@ -285,16 +280,11 @@ class Bomb:
         self.gravity = 0.3
         self.on_screen = True
 
-    def update(self):
-        """更新炸弹位置"""
-        # 应用天气效果
-        weather_effect = self.game.get_weather_effect()
-        self.speed_y *= weather_effect["speed"]
-        self.gravity *= weather_effect["gravity"]
-
-        self.y += self.speed_y
+    def update(self, speed_scale=1.0, gravity_scale=1.0):
+        """更新炸弹位置（天气修正同 Fruit.update）"""
+        self.y += self.speed_y * speed_scale
         self.x += self.speed_x
-        self.speed_y += self.gravity
+        self.speed_y += self.gravity * gravity_scale
 
         # 调整出界判断条件
         if self.y > WINDOW_HEIGHT + self.radius * 2 or self.x < -self.radius or self.x > WINDOW_WIDTH + self.radius:
@@ -571,10 +561,15 @@ class Game:
 
                 self.bombs.append(new_bomb)
 
+        # 天气修正每帧只查一次，作为常量传给所有水果和炸弹
+        weather_effect = self.get_weather_effect()
+        speed_scale = weather_effect["speed"]
+        gravity_scale = weather_effect["gravity"]
+
         # 更新水果
         for fruit in self.fruits[:]:
             if self.freeze_time == 0:
-                fruit.update()
+                fruit.update(speed_scale, gravity_scale)
             if not fruit.on_screen:
                 if isinstance(fruit, Fruit) and not fruit.sliced:  # 确保只有Fruit对象才检查sliced属性
                     self.lives -= 1
@@ -586,7 +581,7 @@ class Game:
         # 更新炸弹
         for bomb in self.bombs[:]:
             if self.freeze_time == 0:
-                bomb.update()
+                bomb.update(speed_scale, gravity_scale)
             if not bomb.on_screen:
                 self.bombs.remove(bomb)
 
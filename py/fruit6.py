@@ -3,9 +3,26 @@ import sys
 import random
 import math
 import os
+import argparse
+import time
+import functools
 
 from pygame.constants import MOUSEBUTTONDOWN, MOUSEBUTTONUP, KEYDOWN, K_r, K_ESCAPE, QUIT
 
+from quality import QualityController, QUALITY_LEVELS
+from spawn import SpawnScheduler, ObjectPool
+from combo import ComboTracker
+from weather import WeatherSystem, WEATHER_STATES
+from input_source import MouseInput, BotInput
+from trajectory import TrajectoryService
+from profile_store import ProfileStore
+from leaderboard import LeaderboardWriter
+from events import EventBus, SliceEvent, ComboEvent, BombEvent, WeatherEvent, GameOverEvent
+from achievements import AchievementTracker, SessionStats
+from render import RenderQueue, particle_sprite, Layer, CachedLayer, Compositor
+from trail import BladeTrail
+from hud import GlyphStrip
+
 # 初始化pygame
 pygame.init()
 pygame.mixer.init()
@@ -20,6 +37,9 @@ if not font_path:
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
 FPS = 60
+FRAME_BUDGET_MS = 1000 / FPS  # 默认目标帧耗时
+WEATHER_DURATION = 30 * FPS  # 每种天气持续30秒（帧数）
+WEATHER_TRANSITION = FPS  # 天气切换时背景淡入1秒
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
@@ -32,7 +52,8 @@ pygame.display.set_caption("切水果游戏")
 clock = pygame.time.Clock()
 
 
-# 加载字体
+# 加载字体（每个字号只加载一次）
+@functools.lru_cache(maxsize=None)
 def get_font(size):
     return pygame.font.Font(font_path, size)
 
@@ -93,9 +114,8 @@ class Fruit:
                 "default": load_image("strawberry.png", (50, 50))
             }
         }
-        self.current_skin = self.game.current_skins[fruit_type]
-        self.image = self.images[fruit_type][self.current_skin]
-        self.sliced_image = self.create_sliced_image()
+        self.current_skin = None
+        self.refresh_skin()
 
         # 加载音效（单个文件）
         self.slice_sound = load_sound("slice.mp3")
@@ -131,6 +151,24 @@ class Fruit:
         self.slice_particles = []
         self.particle_life = 30
 
+    def refresh_skin(self):
+        """皮肤变化时更新图像（对象池复用时调用）"""
+        skin = self.game.current_skins[self.fruit_type]
+        if skin != self.current_skin:
+            self.current_skin = skin
+            self.image = self.images[self.fruit_type][skin]
+            self.sliced_image = self.create_sliced_image()
+            self.half_w = self.image.get_width() // 2  # 切开后的图像尺寸相同
+            self.half_h = self.image.get_height() // 2
+
+    def launch(self, event):
+        """按生成事件重置位置和速度"""
+        self.reset()
+        self.refresh_skin()
+        self.x = event.x
+        self.speed_x = event.speed_x
+        self.speed_y = event.speed_y
+
     def create_sliced_image(self):
         """创建水果被切开的效果图像"""
         original = self.image
@@ -163,12 +201,12 @@ class Fruit:
 
         return sliced
 
-    def update(self):
-        """更新水果位置"""
+    def update(self, speed_scale=1.0, gravity_scale=1.0):
+        """更新水果位置（speed_scale / gravity_scale 为当前天气的修正）"""
         if not self.sliced:
-            self.y += self.speed_y
-            self.x += self.speed_x
-            self.speed_y += self.gravity
+            self.y += self.speed_y * speed_scale
+            self.x += self.speed_x * speed_scale
+            self.speed_y += self.gravity * gravity_scale
 
             # 检查是否出界
             if self.y > WINDOW_HEIGHT + self.radius * 2 or self.x < -self.radius or self.x > WINDOW_WIDTH + self.radius:
@@ -184,18 +222,14 @@ class Fruit:
             if self.particle_life <= 0:
                 self.on_screen = False
 
-    def draw(self, surface):
-        """绘制水果"""
+    def draw(self, sprites, particles):
+        """把水果（及切开后的粒子）加入渲染队列"""
         if not self.sliced:
-            rect = self.image.get_rect(center=(int(self.x), int(self.y)))
-            surface.blit(self.image, rect)
+            sprites.add(self.image, self.x, self.y, self.half_w, self.half_h)
         else:
-            rect = self.sliced_image.get_rect(center=(int(self.x), int(self.y)))
-            surface.blit(self.sliced_image, rect)
-
-            # 绘制粒子
-            for particle in self.slice_particles:
-                pygame.draw.circle(surface, particle[4], (int(particle[0]), int(particle[1])), particle[5])
+            sprites.add(self.sliced_image, self.x, self.y, self.half_w, self.half_h)
+            # 粒子数量多，直接批量生成 (图像, 左上角) 而不逐个调用 add
+            particles.extend([(p[4], (int(p[0]) - p[5], int(p[1]) - p[5])) for p in self.slice_particles])
 
     def slice(self):
         """切水果效果"""
@@ -217,14 +251,22 @@ class Fruit:
                 color = (255, 100, 100)  # 默认颜色
                 particle_count = 12
 
+            # 根据当前画质限制粒子数量和尺寸
+            quality = self.game.quality.settings
+            particle_count = int(particle_count * quality["particle_scale"])
+            particle_count = max(0, min(particle_count, quality["max_particles"] - self.game.live_particles))
+            self.game.live_particles += particle_count
+            size_scale = quality["particle_size"]
+
             # 创建粒子效果
             for _ in range(particle_count):
                 angle = random.uniform(0, 2 * math.pi)
                 speed = random.uniform(1, 5)
-                size = random.randint(5, 10)
+                size = max(1, int(random.randint(5, 10) * size_scale))
                 px = self.x + random.uniform(-self.radius / 2, self.radius / 2)
                 py = self.y + random.uniform(-self.radius / 2, self.radius / 2)
-                self.slice_particles.append([px, py, math.cos(angle) * speed, math.sin(angle) * speed, color, size])
+                self.slice_particles.append([px, py, math.cos(angle) * speed, math.sin(angle) * speed,
+                                             particle_sprite(color, size), size])
 
 
 # 炸弹类
@@ -233,6 +275,8 @@ class Bomb:
         self.game = game
         self.reset()
         self.image = load_image("bomb.png", (60, 60))
+        self.half_w = self.image.get_width() // 2
+        self.half_h = self.image.get_height() // 2
         self.explosion_sound = load_sound("explosion.mp3")
 
     def reset(self):
@@ -254,20 +298,26 @@ class Bomb:
         self.gravity = 0.3
         self.on_screen = True
 
-    def update(self):
+    def update(self, speed_scale=1.0, gravity_scale=1.0):
         """更新炸弹位置"""
-        self.y += self.speed_y
-        self.x += self.speed_x
-        self.speed_y += self.gravity
+        self.y += self.speed_y * speed_scale
+        self.x += self.speed_x * speed_scale
+        self.speed_y += self.gravity * gravity_scale
 
         # 检查是否出界
         if self.y > WINDOW_HEIGHT + self.radius * 2 or self.x < -self.radius or self.x > WINDOW_WIDTH + self.radius:
             self.on_screen = False
 
-    def draw(self, surface):
-        """绘制炸弹"""
-        rect = self.image.get_rect(center=(int(self.x), int(self.y)))
-        surface.blit(self.image, rect)
+    def draw(self, sprites):
+        """把炸弹加入渲染队列"""
+        sprites.add(self.image, self.x, self.y, self.half_w, self.half_h)
+
+    def launch(self, event):
+        """按生成事件重置位置和速度"""
+        self.reset()
+        self.x = event.x
+        self.speed_x = event.speed_x
+        self.speed_y = event.speed_y
 
     def explode(self):
         """炸弹爆炸效果"""
@@ -280,6 +330,8 @@ class Powerup:
         self.game = game
         self.reset()
         self.image = load_image("powerup.png", (60, 60))
+        self.half_w = self.image.get_width() // 2
+        self.half_h = self.image.get_height() // 2
 
     def reset(self):
         self.radius = 30
@@ -298,17 +350,23 @@ class Powerup:
         self.gravity = 0.3
         self.on_screen = True
 
-    def update(self):
-        self.y += self.speed_y
-        self.x += self.speed_x
-        self.speed_y += self.gravity
+    def update(self, speed_scale=1.0, gravity_scale=1.0):
+        self.y += self.speed_y * speed_scale
+        self.x += self.speed_x * speed_scale
+        self.speed_y += self.gravity * gravity_scale
 
         if self.y > WINDOW_HEIGHT + self.radius * 2 or self.x < -self.radius or self.x > WINDOW_WIDTH + self.radius:
             self.on_screen = False
 
-    def draw(self, surface):
-        rect = self.image.get_rect(center=(int(self.x), int(self.y)))
-        surface.blit(self.image, rect)
+    def draw(self, sprites):
+        sprites.add(self.image, self.x, self.y, self.half_w, self.half_h)
+
+    def launch(self, event):
+        """按生成事件重置位置和速度"""
+        self.reset()
+        self.x = event.x
+        self.speed_x = event.speed_x
+        self.speed_y = event.speed_y
 
     def apply_effect(self):
         # 示例效果：双倍分数
@@ -318,17 +376,12 @@ class Powerup:
 
 # 游戏类
 class Game:
-    def __init__(self):
+    def __init__(self, profiler=None, frame_budget_ms=FRAME_BUDGET_MS, seed=None, spawn_overrides=None,
+                 input_source=None, aim_assist=0, profile_store=None, leaderboard=None):
         # 初始化属性（顺序很重要）
         self.difficulty = "medium"  # 默认难度
-        self.weather = "sunny"  # 默认天气
-        self.weather_timer = 0  # 天气切换计时器
-        self.weather_change_interval = random.randint(300, 600)  # 天气切换间隔（帧数）
-        self.weather_effects = {
-            "sunny": {"speed": 1.0, "gravity": 0.9, "accuracy": 1.0},
-            "rainy": {"speed": 0.9, "gravity": 1.0, "accuracy": 0.8},
-            "snowy": {"speed": 0.8, "gravity": 0.8, "accuracy": 0.7}
-        }
+        self.seed = seed  # 随机种子（用于可复现的无界面对局，None 表示随机）
+        self.spawn_overrides = spawn_overrides  # 覆盖生成参数（调参用）
 
         # 水果类型列表（提前定义）
         self.fruit_types = ["apple", "banana", "watermelon", "pear", "strawberry"]
@@ -351,9 +404,10 @@ class Game:
         self.combo_active = False
         self.combo_type = None
         self.combo_timer = 0
-        self.recent_slices = []
+        self.combo_tracker = ComboTracker(2 * FPS)  # 保留2秒（按帧计）内的切片
         self.combo_sound = load_sound("combo.mp3")
-        self.highest_combo = 0  # 新增属性记录最高连击
+        self.highest_combo = 0  # 本局最高连击
+        self.best_combo = 0  # 历史最高连击（存档）
 
         # 道具系统
         self.powerups = []
@@ -371,15 +425,44 @@ class Game:
             "hard_mode": False
         }
 
+        # 存档：启动时读取，之后的修改交给后台线程写入（None 表示不保存，如无界面测试）
+        self.profile_store = profile_store
+        self.load_profile()
+
+        # 排行榜：每局结束时交给后台线程提交成绩（None 表示不记录）
+        self.leaderboard = leaderboard
+
+        # 事件总线：切片、组合技、炸弹、天气、结束等事件每帧末尾统一交给成就和统计处理
+        self.events = EventBus()
+        self.achievement_tracker = AchievementTracker(self, self.events)
+        self.stats = SessionStats(self.events)
+
+        # 刀光拖尾（环形缓冲区，同时供碰撞检测使用）
+        self.trail = BladeTrail(capacity=max(level["trail_points"] for level in QUALITY_LEVELS))
+
+        # 对象池（生成时复用对象，避免重复加载图像）
+        self.fruit_pools = {fruit_type: ObjectPool(lambda t=fruit_type: Fruit(t, self))
+                            for fruit_type in self.fruit_types}
+        self.bomb_pool = ObjectPool(lambda: Bomb(self))
+        self.powerup_pool = ObjectPool(lambda: Powerup(self))
+
+        # 轨迹预测（供机器人规划和辅助瞄准使用）
+        self.trajectories = TrajectoryService(self)
+        self.aim_assist = aim_assist  # 辅助瞄准：刀光也能切中未来几帧内经过的位置（0 表示关闭）
+
+        # 性能分析（可选，见 profiler.py）
+        self.profiler = profiler
+
+        # 自适应画质：帧耗时超出预算时减少粒子和特效
+        self.quality = QualityController(frame_budget_ms)
+        self.live_particles = 0  # 场上粒子总数
+
         # 现在可以安全地调用reset_game()
         self.reset_game()
-        self.last_mouse_pos = None
-        self.slicing = False
+        # 输入源（默认鼠标，也可以是机器人，见 input_source.py）
+        self.input = input_source or MouseInput()
         self.current_screen = "main_menu"  # main_menu, difficulty, game, game_over
 
-        # 新增初始化 last_spawn_time
-        self.last_spawn_time = pygame.time.get_ticks()  # 添加这一行
-
         # 加载背景音乐
         self.background_music = load_sound("background.mp3")
         self.background_music.set_volume(0.3)
@@ -395,31 +478,93 @@ class Game:
             "weather_rainy": load_image("rainy_background.png", (WINDOW_WIDTH, WINDOW_HEIGHT)),
             "weather_snowy": load_image("snowy_background.png", (WINDOW_WIDTH, WINDOW_HEIGHT))
         }
+
+        # 预先合成 难度背景 x 天气 的组合，绘制时只需一次普通 blit
+        self.weather_backgrounds = {}
+        for difficulty in ("easy", "medium", "hard"):
+            for weather in WEATHER_STATES:
+                composite = self.backgrounds[f"game_{difficulty}"].copy()
+                composite.blit(self.backgrounds[f"weather_{weather}"], (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+                self.weather_backgrounds[(difficulty, weather)] = composite.convert()
+
+        # 渲染队列（物体一层、粒子一层，每帧复用）
+        self.sprite_queue = RenderQueue(WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.particle_queue = RenderQueue(WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.hud_glyphs = GlyphStrip(get_font(36), WHITE)
+        self.build_layers()
+
+        # 预先创建冻结蒙层，避免每帧分配全屏表面
+        self.freeze_overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+        self.freeze_overlay.fill((0, 0, 255, 50))  # 蓝色半透明
+
     def reset_game(self):
         """重置游戏状态"""
+        # 回收上一局剩余的对象
+        for fruit in getattr(self, "fruits", []):
+            self.fruit_pools[fruit.fruit_type].release(fruit)
+        for bomb in getattr(self, "bombs", []):
+            self.bomb_pool.release(bomb)
+        for powerup in getattr(self, "powerups", []):
+            self.powerup_pool.release(powerup)
+
         self.fruits = [self.create_random_fruit() for _ in range(3)]
         self.bombs = []
         self.powerups = []
         self.score = 0
         self.lives = 3
+        self.live_particles = 0
         self.game_over = False
         self.level = 1
-        self.fruit_speed = 1.0
-        self.spawn_timer = 0
-
-        # 根据难度设置生成延迟
-        if self.difficulty == "easy":
-            self.spawn_delay = 70  # 每隔70帧生成一个新水果/炸弹
-        elif self.difficulty == "medium":
-            self.spawn_delay = 50  # 每隔50帧生成一个新水果/炸弹
-        else:  # hard
-            self.spawn_delay = 35  # 每隔35帧生成一个新水果/炸弹
-
-        self.last_spawn_time = pygame.time.get_ticks()
+        # 组合技和道具效果都只在一局之内有效（同一个 Game 连续跑多局时不能带到下一局）
+        self.combo_active = False
+        self.combo_type = None
+        self.combo_timer = 0
+        self.highest_combo = 0
+        self.freeze_time = 0
+        self.double_score_timer = 0
+        self.score_multiplier = 1
+        self.combo_tracker.clear()
+        self.result = None  # 本局成绩的提交结果（Future，完成后为本周名次和成绩总数）
+        self.trail.clear()
+        self.events.clear()
+        self.stats.reset()
+
+        # 按模拟帧生成：难度曲线和生成间隔由调度器预先计算
+        self.tick = 0
+        self.spawner = SpawnScheduler(self.difficulty, WINDOW_WIDTH, WINDOW_HEIGHT, self.fruit_types,
+                                      seed=self.seed, overrides=self.spawn_overrides)
+
+        # 天气状态机（按模拟帧切换）
+        self.weather_system = WeatherSystem(WEATHER_DURATION, WEATHER_TRANSITION, seed=self.seed)
+        self.weather_system.subscribe(self.on_weather_change)
+        self.weather = self.weather_system.state
+        self.trajectories.invalidate()
 
     def create_random_fruit(self):
         """创建随机水果"""
-        return Fruit(random.choice(self.fruit_types), self)
+        fruit = self.fruit_pools[random.choice(self.fruit_types)].acquire()
+        fruit.reset()
+        fruit.refresh_skin()
+        return fruit
+
+    def spawn(self, event):
+        """从对象池取出对象并按生成事件放入场景"""
+        if event.kind == "fruit":
+            fruit = self.fruit_pools[event.fruit_type].acquire()
+            fruit.launch(event)
+            self.trajectories.forget(fruit)
+            self.fruits.append(fruit)
+        elif event.kind == "bomb":
+            bomb = self.bomb_pool.acquire()
+            bomb.launch(event)
+            self.trajectories.forget(bomb)
+            self.bombs.append(bomb)
+        else:
+            powerup = self.powerup_pool.acquire()
+            powerup.launch(event)
+            self.trajectories.forget(powerup)
+            self.powerups.append(powerup)
+        self.level = event.level
 
     def point_to_line_distance(self, x1, y1, x2, y2, px, py):
         """计算点 (px, py) 到线段 (x1, y1) - (x2, y2) 的垂直距离"""
@@ -473,7 +618,8 @@ class Game:
         if self.current_screen != "game":
             return
 
-        current_time = pygame.time.get_ticks()
+        # 模拟帧计数（生成、天气、连击都以此为时钟）
+        self.tick += 1
 
         # 更新天气
         self.update_weather()
@@ -483,167 +629,61 @@ class Game:
 
         # 处理冻结时间
         if self.freeze_time > 0:
+            # 冻结期间物体直接暂停更新，速度保持不变，解冻后按原速度继续运动
             self.freeze_time -= 1
-            if self.freeze_time == 0:
-                # 恢复水果速度
-                for fruit in self.fruits:
-                    if isinstance(fruit, Fruit):  # 确保只有Fruit对象才调整速度
-                        fruit.speed_y /= 0.2  # 假设冻结时速度为0.2倍
         # 双倍分数计时器
         if self.double_score_timer > 0:
             self.double_score_timer -= 1
             if self.double_score_timer == 0:
                 self.score_multiplier = 1
 
-        # 生成新水果/炸弹
-        if current_time - self.last_spawn_time > self.spawn_delay * 1000 / FPS:
-            self.spawn_timer += 1
-            self.last_spawn_time = current_time
-
-            # 每5个生成周期增加一个难度级别
-            if self.spawn_timer % 5 == 0:
-                self.level += 1
-                if self.spawn_delay > 15:  # 难度上限
-                    self.spawn_delay -= 2
-                self.fruit_speed += 0.05
-
-            # 根据难度调整炸弹生成概率
-            bomb_chance = 0.15  # 中等难度
-            if self.difficulty == "easy":
-                bomb_chance = 0.1
-            elif self.difficulty == "hard":
-                bomb_chance = 0.25
-
-            # 生成水果或炸弹
-            if random.random() > bomb_chance:
-                # 创建随机水果或道具
-                new_fruit = self.create_random_fruit()
-
-                # 调整水果初始速度，确保能飞到屏幕中上部
-                base_vertical_speed = -10  # 基础垂直速度（负值表示向上）
-                base_horizontal_speed = 2  # 基础水平速度
-
-                # 根据难度调整速度
-                if self.difficulty == "easy":
-                    speed_factor = 0.8
-                elif self.difficulty == "hard":
-                    speed_factor = 1.2
-                else:
-                    speed_factor = 1.0
-
-                # 应用难度和游戏进度的速度因子
-                new_fruit.speed_y = base_vertical_speed * speed_factor * self.fruit_speed
-                new_fruit.speed_x = random.uniform(-base_horizontal_speed,
-                                                   base_horizontal_speed) * speed_factor * self.fruit_speed
-
-                self.fruits.append(new_fruit)
-            else:
-                # 创建炸弹
-                new_bomb = Bomb(self)
-
-                # 调整炸弹初始速度，与水果保持一致
-                base_vertical_speed = -10
-                base_horizontal_speed = 2
-
-                if self.difficulty == "easy":
-                    speed_factor = 0.8
-                elif self.difficulty == "hard":
-                    speed_factor = 1.2
-                else:
-                    speed_factor = 1.0
-
-                new_bomb.speed_y = base_vertical_speed * speed_factor * self.fruit_speed
-                new_bomb.speed_x = random.uniform(-base_horizontal_speed,
-                                                  base_horizontal_speed) * speed_factor * self.fruit_speed
+        # 生成新水果/炸弹（按模拟帧从预先计算的生成队列中取出）
+        for event in self.spawner.pop_due(self.tick):
+            self.spawn(event)
 
-                self.bombs.append(new_bomb)
-
-            # 随机生成道具
-            if random.random() < 0.05:
-                new_powerup = Powerup(self)
-                new_powerup.speed_y = base_vertical_speed * speed_factor * self.fruit_speed
-                new_powerup.speed_x = random.uniform(-base_horizontal_speed,
-                                                     base_horizontal_speed) * speed_factor * self.fruit_speed
-                self.powerups.append(new_powerup)
+        # 当前天气的物理修正（每帧读取一次）
+        speed_scale = self.weather_system.speed
+        gravity_scale = self.weather_system.gravity
 
         # 更新水果
         for fruit in self.fruits[:]:
             if self.freeze_time == 0:
-                fruit.update()
+                fruit.update(speed_scale, gravity_scale)
             if not fruit.on_screen:
                 if isinstance(fruit, Fruit) and not fruit.sliced:  # 确保只有Fruit对象才检查sliced属性
                     self.lives -= 1
                     if self.lives <= 0:
-                        self.game_over = True
-                        self.current_screen = "game_over"
+                        self.end_game("lives")
+                self.live_particles -= len(fruit.slice_particles)
                 self.fruits.remove(fruit)
+                self.fruit_pools[fruit.fruit_type].release(fruit)
 
         # 更新炸弹
         for bomb in self.bombs[:]:
             if self.freeze_time == 0:
-                bomb.update()
+                bomb.update(speed_scale, gravity_scale)
             if not bomb.on_screen:
                 self.bombs.remove(bomb)
+                self.bomb_pool.release(bomb)
 
         # 更新道具
         for powerup in self.powerups[:]:
             if self.freeze_time == 0:
-                powerup.update()
+                powerup.update(speed_scale, gravity_scale)
             if not powerup.on_screen:
                 self.powerups.remove(powerup)
+                self.powerup_pool.release(powerup)
 
-            # 处理鼠标切片
-        if self.slicing and self.last_mouse_pos:
-            current_mouse_pos = pygame.mouse.get_pos()
-
-            # 检查是否切到水果
-            for fruit in self.fruits:
-                if isinstance(fruit, Fruit) and not fruit.sliced:
-                    # 使用改进的线段与圆相交检测
-                    if self.line_segment_intersects_circle(
-                            self.last_mouse_pos[0], self.last_mouse_pos[1],
-                            current_mouse_pos[0], current_mouse_pos[1],
-                            fruit.x, fruit.y, fruit.radius * 0.8  # 略微缩小碰撞半径
-                    ):
-                        fruit.slice()
-                        self.score += 1 * self.score_multiplier
-                        self.recent_slices.append((fruit.combo_type, pygame.time.get_ticks()))
-                        if not self.achievements["first_slice"]:
-                            self.achievements["first_slice"] = True
-                        # 检查成就
-                        if self.score >= 100 and not self.achievements["100_score"]:
-                            self.achievements["100_score"] = True
-                            self.unlock_skin("watermelon", "frost")
-
-            # 检查是否切到炸弹
-            for bomb in self.bombs:
-                # 计算鼠标轨迹与炸弹的距离
-                distance = self.point_to_line_distance(
-                    self.last_mouse_pos[0], self.last_mouse_pos[1],
-                    current_mouse_pos[0], current_mouse_pos[1],
-                    bomb.x, bomb.y
-                )
-                if distance <= bomb.radius:
-                    bomb.explode()
-                    self.game_over = True
-                    self.current_screen = "game_over"
-
-            # 检查是否切到道具
-            for powerup in self.powerups:
-                distance = self.point_to_line_distance(
-                    self.last_mouse_pos[0], self.last_mouse_pos[1],
-                    current_mouse_pos[0], current_mouse_pos[1],
-                    powerup.x, powerup.y
-                )
-                if distance <= powerup.radius:
-                    powerup.apply_effect()
-                    self.powerups.remove(powerup)
-
-        self.last_mouse_pos = pygame.mouse.get_pos()
+        # 处理切片（鼠标或机器人给出的刀光轨迹）：先记入拖尾缓冲区，碰撞检测读取其中最新的一段
+        stroke = self.input.stroke(self)
+        if stroke:
+            self.trail.add_stroke(*stroke, self.tick)
+            self.process_slice(*self.trail.last_segment())
+        else:
+            self.trail.break_stroke()
 
         # 清理过期的切片记录
-        current_time = pygame.time.get_ticks()
-        self.recent_slices = [s for s in self.recent_slices if current_time - s[1] < 2000]  # 保留2秒内的切片
+        self.combo_tracker.evict(self.tick)
 
         # 限制水果最大速度，防止飞出屏幕
         max_vertical_speed = 20
@@ -654,6 +694,63 @@ class Game:
                 fruit.speed_y = max(-max_vertical_speed, min(fruit.speed_y, max_vertical_speed))
                 fruit.speed_x = max(-max_horizontal_speed, min(fruit.speed_x, max_horizontal_speed))
 
+        # 处理本帧的事件（成就、统计）
+        self.events.dispatch()
+
+        # 本局结束：等本帧事件处理完（最高连击已更新）再提交，排行榜记录的就是结算界面显示的值
+        # 提交在后台线程完成，不阻塞当前帧；每局只提交一次
+        if self.game_over and self.leaderboard and self.result is None:
+            self.result = self.leaderboard.submit(self.difficulty, self.score, combo=self.highest_combo,
+                                                  level=self.level)
+
+    def end_game(self, cause):
+        """结束本局（cause: lives 生命耗尽 / bomb 切到炸弹）
+        同一帧内可能同时满足两个条件，只处理第一次；新的一局由 reset_game 清除 game_over"""
+        if self.game_over:
+            return
+        self.game_over = True
+        self.current_screen = "game_over"
+        self.events.emit(GameOverEvent(self.tick, cause, self.score, self.level, self.difficulty))
+
+    def process_slice(self, start, end):
+        """处理一段刀光轨迹（start -> end）与水果、炸弹、道具的碰撞"""
+        x1, y1 = start
+        x2, y2 = end
+        hit_scale = 0.8 * self.weather_system.accuracy  # 略微缩小碰撞半径，并受天气影响
+
+        # 检查是否切到水果
+        for fruit in self.fruits:
+            if isinstance(fruit, Fruit) and not fruit.sliced:
+                # 使用改进的线段与圆相交检测
+                if self.line_segment_intersects_circle(x1, y1, x2, y2, fruit.x, fruit.y, fruit.radius * hit_scale) \
+                        or (self.aim_assist and self.hits_predicted(fruit, x1, y1, x2, y2, fruit.radius * hit_scale)):
+                    fruit.slice()
+                    self.score += 1 * self.score_multiplier
+                    self.combo_tracker.add(fruit.combo_type, self.tick)
+                    self.events.emit(SliceEvent(self.tick, fruit.fruit_type, fruit.combo_type, self.score))
+
+        # 检查是否切到炸弹（与水果相同的线段检测，避免整条直线延长线都算切中）
+        for bomb in self.bombs:
+            if self.line_segment_intersects_circle(x1, y1, x2, y2, bomb.x, bomb.y, bomb.radius):
+                bomb.explode()
+                self.events.emit(BombEvent(self.tick))
+                self.end_game("bomb")
+
+        # 检查是否切到道具
+        for powerup in self.powerups[:]:
+            if self.line_segment_intersects_circle(x1, y1, x2, y2, powerup.x, powerup.y, powerup.radius):
+                powerup.apply_effect()
+                self.powerups.remove(powerup)
+                self.powerup_pool.release(powerup)
+
+    def hits_predicted(self, fruit, x1, y1, x2, y2, radius):
+        """辅助瞄准：检查刀光是否切中水果未来 aim_assist 帧内的位置"""
+        for ticks_ahead in range(1, self.aim_assist + 1):
+            px, py = self.trajectories.position(fruit, ticks_ahead)
+            if self.line_segment_intersects_circle(x1, y1, x2, y2, px, py, radius):
+                return True
+        return False
+
     def draw(self, surface):
         """绘制游戏界面"""
         if self.current_screen == "main_menu":
@@ -762,99 +859,115 @@ class Game:
             "back": back_button
         }
 
+    def build_layers(self):
+        """游戏界面的图层（从下到上）。缓存图层只在其 key 变化时重新渲染"""
+        quality = self.quality
+        self.game_layers = Compositor([
+            Layer("background", self.draw_background),
+            Layer("entities", self.draw_entities),
+            Layer("particles", self.particle_queue.flush),
+            CachedLayer("hud", self.render_hud,
+                        key=lambda: (self.score, self.lives, self.level, self.difficulty, self.weather)),
+            Layer("trail", self.draw_trail),
+            CachedLayer("combo", self.render_combo_banner,
+                        key=lambda: self.combo_active and (self.get_combo_effect_name(), quality.settings["glow"])),
+            CachedLayer("effects", self.render_effects,
+                        key=lambda: (self.double_score_timer > 0 and self.score_multiplier,
+                                     self.freeze_time > 0 and (self.freeze_time // FPS,
+                                                               quality.settings["freeze_overlay"]))),
+            CachedLayer("ui", self.render_game_ui),
+        ])
+
     def draw_game(self, surface):
         """绘制游戏界面"""
-        # 根据难度和天气选择背景
-        if self.difficulty == "easy":
-            base_bg = self.backgrounds["game_easy"]
-        elif self.difficulty == "hard":
-            base_bg = self.backgrounds["game_hard"]
+        self.game_layers.draw(surface)
+
+    def draw_background(self, surface):
+        # 根据难度和天气选择预先合成的背景
+        background = self.weather_backgrounds[(self.difficulty, self.weather)]
+        progress = self.weather_system.transition_progress(self.tick)
+        if progress is not None and self.quality.settings["weather_blend"]:
+            # 天气切换过渡：旧天气背景上淡入新天气背景（低画质时跳过）
+            previous = self.weather_backgrounds[(self.difficulty, self.weather_system.previous)]
+            surface.blit(previous, (0, 0))
+            background.set_alpha(int(255 * progress))
+            surface.blit(background, (0, 0))
+            background.set_alpha(None)
         else:
-            base_bg = self.backgrounds["game_medium"]
-
-        weather_bg = self.backgrounds[f"weather_{self.weather}"]
+            surface.blit(background, (0, 0))
 
-        # 绘制背景
-        surface.blit(base_bg, (0, 0))
-        # 叠加天气效果
-        surface.blit(weather_bg, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-
-        # 绘制水果
+    def draw_entities(self, surface):
+        # 水果、炸弹、道具先加入渲染队列，再用一次 blits 提交；粒子由 particles 图层提交
+        sprites = self.sprite_queue
+        particles = self.particle_queue
+        particles.clear()
         for fruit in self.fruits:
-            fruit.draw(surface)
-
-        # 绘制炸弹
+            fruit.draw(sprites, particles)
         for bomb in self.bombs:
-            bomb.draw(surface)
-
-        # 绘制道具
+            bomb.draw(sprites)
         for powerup in self.powerups:
-            powerup.draw(surface)
-
-        # 绘制分数
-        score_text = get_font(36).render(f"分数: {self.score}", True, WHITE)
-        surface.blit(score_text, (20, 20))
-
-        # 绘制生命值
-        lives_text = get_font(36).render(f"生命值: {self.lives}", True, WHITE)
-        surface.blit(lives_text, (20, 60))
-
-        # 绘制等级
-        level_text = get_font(36).render(f"等级: {self.level}", True, WHITE)
-        surface.blit(level_text, (20, 100))
-
-        # 绘制难度
-        difficulty_text = get_font(36).render(f"难度: {self.get_difficulty_name()}", True, WHITE)
-        surface.blit(difficulty_text, (20, 140))
-
-        # 绘制天气
-        weather_text = get_font(36).render(f"天气: {self.get_weather_name()}", True, WHITE)
-        surface.blit(weather_text, (20, 180))
-
-        # 绘制当前鼠标轨迹
-        if self.slicing and self.last_mouse_pos:
-            current_pos = pygame.mouse.get_pos()
-            pygame.draw.line(surface, WHITE, self.last_mouse_pos, current_pos, 3)
-
+            powerup.draw(sprites)
+        sprites.flush(surface)
+
+    def render_hud(self):
+        # 分数、生命值、等级由预渲染的数字字形拼出，难度、天气使用缓存的文字
+        glyphs = self.hud_glyphs
+        items = []
+        glyphs.add_counter(items, "分数: ", self.score, 20, 20)
+        glyphs.add_counter(items, "生命值: ", max(self.lives, 0), 20, 60)
+        glyphs.add_counter(items, "等级: ", self.level, 20, 100)
+        items.append((glyphs.label(f"难度: {self.get_difficulty_name()}"), (20, 140)))
+        items.append((glyphs.label(f"天气: {self.get_weather_name()}"), (20, 180)))
+        return items
+
+    def draw_trail(self, surface):
+        # 绘制刀光拖尾（点数随画质调整）
+        self.trail.draw(surface, self.tick, self.quality.settings["trail_points"])
+
+    def render_combo_banner(self):
         # 绘制组合技效果
-        if self.combo_active:
-            combo_text = get_font(48).render(f"COMBO! {self.get_combo_effect_name()}", True, YELLOW)
-            combo_rect = combo_text.get_rect(center=(WINDOW_WIDTH // 2, 50))
-            # 添加发光效果
+        if not self.combo_active:
+            return []
+        combo_text = get_font(48).render(f"COMBO! {self.get_combo_effect_name()}", True, YELLOW)
+        combo_rect = combo_text.get_rect(center=(WINDOW_WIDTH // 2, 50))
+        items = []
+        # 添加发光效果（低画质时跳过）
+        if self.quality.settings["glow"]:
             glow_surface = pygame.Surface(combo_rect.size, pygame.SRCALPHA)
-            glow_surface.fill((0, 0, 0, 0))
             pygame.draw.rect(glow_surface, (255, 255, 0, 128), glow_surface.get_rect(), border_radius=10)
-            surface.blit(glow_surface, combo_rect.topleft)
-            surface.blit(combo_text, combo_rect)
+            items.append((glow_surface, combo_rect.topleft))
+        items.append((combo_text, combo_rect))
+        return items
 
+    def render_effects(self):
+        items = []
         # 绘制双倍分数效果
         if self.double_score_timer > 0:
             multiplier_text = get_font(36).render(f"双倍分数! x{self.score_multiplier}", True, RED)
-            multiplier_rect = multiplier_text.get_rect(topright=(WINDOW_WIDTH - 20, 20))
-            surface.blit(multiplier_text, multiplier_rect)
-
-            # 绘制冻结时间效果
-            if self.freeze_time > 0:
-                # 创建半透明覆盖层
-                overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-                overlay.fill((0, 0, 255, 50))  # 蓝色半透明
-                surface.blit(overlay, (0, 0))
+            items.append((multiplier_text, multiplier_text.get_rect(topright=(WINDOW_WIDTH - 20, 20))))
 
-                # 显示冻结时间倒计时
-                freeze_text = get_font(72).render(f"时间冻结! {self.freeze_time // FPS + 1}", True, BLUE)
-                freeze_rect = freeze_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-
-                # 添加文字阴影效果
-                shadow_text = get_font(72).render(f"时间冻结! {self.freeze_time // FPS + 1}", True, BLACK)
-                shadow_rect = shadow_text.get_rect(center=(freeze_rect.centerx + 3, freeze_rect.centery + 3))
-                surface.blit(shadow_text, shadow_rect)
-
-                surface.blit(freeze_text, freeze_rect)
-
-        # 返回按钮
+        # 绘制冻结时间效果
+        if self.freeze_time > 0:
+            # 半透明覆盖层（低画质时跳过）
+            if self.quality.settings["freeze_overlay"]:
+                items.append((self.freeze_overlay, (0, 0)))
+
+            # 显示冻结时间倒计时，并添加文字阴影效果
+            font = get_font(72)
+            text = f"时间冻结! {self.freeze_time // FPS + 1}"
+            freeze_text = font.render(text, True, BLUE)
+            freeze_rect = freeze_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
+            items.append((font.render(text, True, BLACK), freeze_rect.move(3, 3)))
+            items.append((freeze_text, freeze_rect))
+        return items
+
+    def render_game_ui(self):
+        # 返回按钮（静态，只渲染一次）
         back_button = pygame.Rect(20, WINDOW_HEIGHT - 60, 120, 50)
-        self.draw_button(surface, back_button, "返回菜单", (100, 100, 100))
         self.game_buttons = {"back": back_button}
+        button = pygame.Surface(back_button.size, pygame.SRCALPHA)
+        self.draw_button(button, button.get_rect(), "返回菜单", (100, 100, 100))
+        return [(button, back_button.topleft)]
 
     def draw_game_over(self, surface):
         """绘制游戏结束界面"""
@@ -878,6 +991,13 @@ class Game:
         combo_rect = combo_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 50))
         surface.blit(combo_text, combo_rect)
 
+        # 本周排名（后台提交完成后才显示，提交失败则不显示）
+        if self.result is not None and self.result.done() and self.result.exception() is None:
+            rank, total = self.result.result()
+            rank_text = get_font(26).render(f"本周{self.get_difficulty_name()}排名: {rank} / {total}", True, YELLOW)
+            rank_rect = rank_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 85))
+            surface.blit(rank_text, rank_rect)
+
         # 绘制按钮
         button_width = 200
         button_height = 50
@@ -1023,20 +1143,26 @@ class Game:
     def handle_main_menu_click(self, pos):
         """处理主菜单按钮点击"""
         action_map = {
-            "start": lambda: setattr(self, "current_screen", "game"),
+            "start": self.start_game,
             "difficulty": lambda: setattr(self, "current_screen", "difficulty"),
             "achievements": lambda: setattr(self, "current_screen", "achievements"),
             "skins": lambda: setattr(self, "current_screen", "skins"),
-            "exit": lambda: (pygame.quit(), sys.exit())
+            "exit": self.quit
         }
         self.check_button_click(pos, self.menu_buttons, action_map)
 
+    def start_game(self):
+        """从主菜单开始游戏：上一局已经结束时先重置，否则继续当前这一局"""
+        if self.game_over:
+            self.reset_game()
+        self.current_screen = "game"
+
     def handle_difficulty_click(self, pos):
         """处理难度选择菜单按钮点击"""
         action_map = {
-            "easy": lambda: (setattr(self, "difficulty", "easy"), setattr(self, "current_screen", "main_menu")),
-            "medium": lambda: (setattr(self, "difficulty", "medium"), setattr(self, "current_screen", "main_menu")),
-            "hard": lambda: (setattr(self, "difficulty", "hard"), setattr(self, "current_screen", "main_menu")),
+            "easy": lambda: (self.set_difficulty("easy"), setattr(self, "current_screen", "main_menu")),
+            "medium": lambda: (self.set_difficulty("medium"), setattr(self, "current_screen", "main_menu")),
+            "hard": lambda: (self.set_difficulty("hard"), setattr(self, "current_screen", "main_menu")),
             "back": lambda: setattr(self, "current_screen", "main_menu")
         }
         self.check_button_click(pos, self.difficulty_buttons, action_map)
@@ -1073,13 +1199,13 @@ class Game:
                     # 解析按钮ID为水果和皮肤类型
                     fruit, skin = button_id.split('_')
                     self.current_skins[fruit] = skin
+                    self.save_profile()
                 break
 
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == QUIT:
-                pygame.quit()
-                sys.exit()
+                self.quit()
             elif event.type == KEYDOWN:
                 if event.key == K_ESCAPE:
                     if self.current_screen == "game":
@@ -1092,8 +1218,7 @@ class Game:
                         self.current_screen = "game"
             elif event.type == MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
-                self.slicing = True
-                self.last_mouse_pos = mouse_pos
+                self.input.handle_event(event)
 
                 # 处理不同屏幕的按钮点击
                 if self.current_screen == "main_menu":
@@ -1110,8 +1235,7 @@ class Game:
                     self.handle_skins_click(mouse_pos)
 
             elif event.type == MOUSEBUTTONUP:
-                self.slicing = False
-                self.last_mouse_pos = None
+                self.input.handle_event(event)
 
     def check_combo(self):
         """检查并触发组合技"""
@@ -1120,40 +1244,40 @@ class Game:
             if self.combo_timer <= 0:
                 self.combo_active = False
 
-        # 至少需要2个切片才能触发组合技
-        if len(self.recent_slices) >= 2 and not self.combo_active:
-            combo_types = [s[0] for s in self.recent_slices]
-
-            # 检查是否有至少两种不同类型的水果被同时切开
-            unique_types = set(combo_types)
-            if len(unique_types) >= 2:
-                # 触发组合技
-                self.trigger_combo(unique_types)
+        # 至少需要2个切片、且至少两种不同类型的水果被同时切开才能触发组合技
+        tracker = self.combo_tracker
+        if len(tracker) >= 2 and tracker.distinct >= 2 and not self.combo_active:
+            self.trigger_combo()
 
-    def trigger_combo(self, combo_types):
+    def trigger_combo(self):
+        tracker = self.combo_tracker
         self.combo_active = True
         self.combo_timer = 2 * FPS  # 组合技持续2秒
 
         # 简单示例：根据组合类型增加分数或冻结时间
-        if "fire" in combo_types and "explosion" in combo_types:
+        if tracker.has("fire") and tracker.has("explosion"):
             self.score += 20 * self.score_multiplier
-        elif "freeze" in combo_types:
+        elif tracker.has("freeze"):
             self.freeze_time = 3 * FPS
+            self.trajectories.invalidate()
 
-        # 更新最高连击
-        if len(self.recent_slices) > self.highest_combo:
-            self.highest_combo = len(self.recent_slices)
+        self.events.emit(ComboEvent(self.tick, len(tracker), self.get_combo_effect_name()))
 
     def update_weather(self):
-        # 简单示例：每30秒随机切换一次天气
-        if pygame.time.get_ticks() % 30000 < FPS:
-            self.weather = random.choice(list(self.weather_effects.keys()))
-            if len(set(self.weather_effects.keys())) == len(self.achievements.get("weather_history", [])) + 1:
-                self.achievements["all_weather"] = True
-            if "weather_history" not in self.achievements:
-                self.achievements["weather_history"] = []
-            if self.weather not in self.achievements["weather_history"]:
-                self.achievements["weather_history"].append(self.weather)
+        # 每30秒（按模拟帧）切换一次天气
+        self.weather_system.update(self.tick)
+
+    def on_weather_change(self, old, new):
+        """天气变化：更新当前天气，天气成就由事件处理"""
+        self.weather = new
+        self.trajectories.invalidate()
+        self.events.emit(WeatherEvent(self.tick, old, new))
+
+    def set_difficulty(self, difficulty):
+        """切换难度，并按新难度重新生成后续的生成计划"""
+        self.difficulty = difficulty
+        self.spawner = SpawnScheduler(difficulty, WINDOW_WIDTH, WINDOW_HEIGHT, self.fruit_types,
+                                      seed=self.seed, start_tick=self.tick, overrides=self.spawn_overrides)
 
     def get_difficulty_name(self):
         if self.difficulty == "easy":
@@ -1173,10 +1297,10 @@ class Game:
 
     def get_combo_effect_name(self):
         # 简单示例：根据组合类型返回效果名称
-        combo_types = [s[0] for s in self.recent_slices]
-        if "fire" in combo_types and "explosion" in combo_types:
+        tracker = self.combo_tracker
+        if tracker.has("fire") and tracker.has("explosion"):
             return "火焰爆炸"
-        elif "freeze" in combo_types:
+        elif tracker.has("freeze"):
             return "时间冻结"
         return "未知组合技"
 
@@ -1185,14 +1309,89 @@ class Game:
             self.unlocked_skins[fruit] = []
         if skin not in self.unlocked_skins[fruit]:
             self.unlocked_skins[fruit].append(skin)
+            self.save_profile()
+
+    def load_profile(self):
+        """用存档覆盖默认值（存档中没有的新成就保留默认值）"""
+        store = self.profile_store
+        if store is None:
+            return
+        self.achievements.update(store.load("achievements", {}))
+        self.unlocked_skins.update(store.load("unlocked_skins", {}))
+        self.current_skins.update(store.load("current_skins", {}))
+        self.best_combo = store.load("highest_combo", self.best_combo)
+
+    def save_profile(self):
+        """把存档交给后台线程写入，不阻塞当前帧"""
+        if self.profile_store is None:
+            return
+        self.profile_store.save(achievements=self.achievements, unlocked_skins=self.unlocked_skins,
+                                current_skins=self.current_skins, highest_combo=self.best_combo)
+
+    def quit(self):
+        """退出游戏"""
+        if self.profiler:
+            self.profiler.close()
+        if self.profile_store:
+            self.profile_store.close()
+        if self.leaderboard:
+            self.leaderboard.close()
+        pygame.quit()
+        sys.exit()
 
     def run(self):
         while True:
+            frame_start = time.perf_counter()
             self.handle_events()  # 调用 handle_events 处理所有事件
-            self.update()
-            self.draw(screen)
+            if self.current_screen == "game_over" and self.input.autoplay:
+                # 机器人模式：自动开始下一局
+                self.reset_game()
+                self.current_screen = "game"
+            if self.profiler:
+                self.profiler.run_frame(self, screen)
+            else:
+                self.update()
+                self.draw(screen)
             pygame.display.flip()
+            # 记录本帧实际耗时（不含 tick 的等待时间），用于自适应画质
+            # 性能分析时帧耗时包含分析器本身的开销，不计入，以免画质被误降级、分析结果也随之失真
+            if not self.profiler:
+                self.quality.record((time.perf_counter() - frame_start) * 1000)
             clock.tick(FPS)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="切水果游戏")
+    parser.add_argument("--profile", choices=["cprofile", "sample"], help="对 update/draw 进行性能分析")
+    parser.add_argument("--profile-frames", type=int, help="每次分析的帧数")
+    parser.add_argument("--profile-screen", help="只在指定界面下分析，如 game")
+    parser.add_argument("--profile-dir", default="profiles", help="分析结果输出目录")
+    parser.add_argument("--frame-budget", type=float, default=FRAME_BUDGET_MS,
+                        help="目标帧耗时（毫秒），超出时自动降低画质")
+    parser.add_argument("--bot", action="store_true", help="由机器人自动游戏（用于压测和长时间运行测试）")
+    parser.add_argument("--seed", type=int, help="随机种子")
+    parser.add_argument("--aim-assist", type=int, default=0, help="辅助瞄准预测的帧数（0 表示关闭）")
+    parser.add_argument("--save-db", default="save/profile.db", help="存档数据库路径")
+    parser.add_argument("--leaderboard-db", default="save/leaderboard.db", help="排行榜数据库路径")
+    parser.add_argument("--device", help="排行榜中的设备名（默认取主机名）")
+    parser.add_argument("--no-save", action="store_true", help="不读取也不保存存档和排行榜")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    game = Game()
+    args = parse_args()
+    profiler = None
+    if args.profile:
+        from profiler import GameProfiler
+        # 未指定界面时默认分析600帧
+        frames = args.profile_frames or (None if args.profile_screen else 600)
+        profiler = GameProfiler(args.profile, frames=frames,
+                                screen=args.profile_screen, output_dir=args.profile_dir)
+    input_source = BotInput(WINDOW_WIDTH, WINDOW_HEIGHT, seed=args.seed) if args.bot else None
+    profile_store = None if args.no_save else ProfileStore(args.save_db)
+    leaderboard = None if args.no_save else LeaderboardWriter(args.leaderboard_db, device=args.device)
+    game = Game(profiler=profiler, frame_budget_ms=args.frame_budget, seed=args.seed, input_source=input_source,
+                aim_assist=args.aim_assist, profile_store=profile_store, leaderboard=leaderboard)
+    if args.bot:
+        game.current_screen = "game"
     game.run()
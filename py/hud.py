@@ -0,0 +1,45 @@
+import pygame
+
+DIGITS = "0123456789"
+
+
+# 数字字形条：某个字号/颜色的 0-9 预先渲染到一张图上，数字由若干次小 blit 拼出
+# 标签文字（如“分数: ”）同样只渲染一次并缓存
+class GlyphStrip:
+    def __init__(self, font, color):
+        self.font = font
+        self.color = color
+        self.labels = {}
+
+        glyphs = [font.render(digit, True, color) for digit in DIGITS]
+        self.widths = [glyph.get_width() for glyph in glyphs]
+        self.height = max(glyph.get_height() for glyph in glyphs)
+        self.strip = pygame.Surface((sum(self.widths), self.height), pygame.SRCALPHA)
+        self.areas = []
+        x = 0
+        for glyph, width in zip(glyphs, self.widths):
+            # 目标是全透明的，用 ADD 直接拷贝像素（普通 blit 会把边缘的半透明像素与黑色混合）
+            self.strip.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_ADD)
+            self.areas.append(pygame.Rect(x, 0, width, self.height))
+            x += width
+
+    def label(self, text):
+        """渲染并缓存一段静态文字"""
+        image = self.labels.get(text)
+        if image is None:
+            image = self.labels[text] = self.font.render(text, True, self.color)
+        return image
+
+    def add_number(self, items, value, x, y):
+        """把非负整数 value 的各位数字加入 blits 列表，返回结束处的 x"""
+        for char in str(value):
+            digit = ord(char) - 48
+            items.append((self.strip, (x, y), self.areas[digit]))
+            x += self.widths[digit]
+        return x
+
+    def add_counter(self, items, label, value, x, y):
+        """“标签 + 数字”，如 分数: 123"""
+        image = self.label(label)
+        items.append((image, (x, y)))
+        return self.add_number(items, value, x + image.get_width(), y)
@@ -0,0 +1,141 @@
+import math
+import random
+
+import pygame
+from pygame.constants import MOUSEBUTTONDOWN, MOUSEBUTTONUP
+
+
+# 输入源：每帧给出一段刀光轨迹 (start, end)，没有出刀时返回 None
+# last_stroke 保存最近一帧的轨迹（绘制使用游戏的刀光拖尾 trail.py）
+# autoplay 为 True 的输入源在游戏结束后自动开始下一局（用于长时间无人值守运行）
+
+# 鼠标输入（默认）
+class MouseInput:
+    autoplay = False
+
+    def __init__(self):
+        self.slicing = False
+        self.last_pos = None
+        self.last_stroke = None
+
+    def handle_event(self, event):
+        """处理鼠标按下/抬起事件"""
+        if event.type == MOUSEBUTTONDOWN:
+            self.slicing = True
+            self.last_pos = event.pos
+        elif event.type == MOUSEBUTTONUP:
+            self.slicing = False
+            self.last_pos = None
+
+    def stroke(self, game):
+        pos = pygame.mouse.get_pos()
+        self.last_stroke = (self.last_pos, pos) if self.slicing and self.last_pos else None
+        self.last_pos = pos
+        return self.last_stroke
+
+
+# 机器人输入：观察场上物体，移动刀锋去拦截水果并避开炸弹
+class BotInput:
+    autoplay = True
+
+    def __init__(self, width, height, speed=40, overshoot=30, bomb_margin=20, lookahead=30, seed=None):
+        """
+        speed: 刀锋每帧最多移动的像素
+        overshoot: 切过水果后继续划出的距离
+        bomb_margin: 轨迹与炸弹之间保留的安全距离
+        lookahead: 规划拦截点时最多预测的帧数
+        """
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.overshoot = overshoot
+        self.bomb_margin = bomb_margin
+        self.lookahead = lookahead
+        self.rng = random.Random(seed)
+        self.pos = (width / 2, height / 2)
+        self.last_stroke = None
+
+    def handle_event(self, event):
+        pass
+
+    def stroke(self, game):
+        self.last_stroke = None
+        target = self.choose_target(game)
+        if target is None:
+            return None
+
+        x, y = self.pos
+        dx = target.x - x
+        dy = target.y - y
+        distance = math.hypot(dx, dy)
+
+        if distance > self.speed:
+            # 距离太远：抬起刀锋，朝预测的拦截点移动
+            aim_x, aim_y = self.intercept(game, target)
+            dx = aim_x - x
+            dy = aim_y - y
+            step = min(self.speed, math.hypot(dx, dy))
+            if step > 0:
+                scale = step / math.hypot(dx, dy)
+                self.pos = (x + dx * scale, y + dy * scale)
+            return None
+
+        # 已经够近：穿过目标划一刀
+        if distance == 0:
+            angle = self.rng.uniform(0, 2 * math.pi)
+            dx, dy, distance = math.cos(angle), math.sin(angle), 1.0
+        end = (target.x + dx / distance * self.overshoot, target.y + dy / distance * self.overshoot)
+        if not self.is_safe(game, self.pos, end):
+            return None
+
+        self.last_stroke = (self.pos, end)
+        self.pos = end
+        return self.last_stroke
+
+    def intercept(self, game, target):
+        """找到刀锋能及时赶到的最早预测位置"""
+        x, y = self.pos
+        trajectories = game.trajectories
+        for ticks_ahead in range(1, self.lookahead + 1):
+            px, py = trajectories.position(target, ticks_ahead)
+            if math.hypot(px - x, py - y) <= self.speed * ticks_ahead:
+                return px, py
+        # 预测范围内赶不上，直接追当前位置
+        return target.x, target.y
+
+    def choose_target(self, game):
+        """选择目标：在来得及赶到的水果中，优先预测最先掉出屏幕的那个"""
+        best = None
+        best_key = None
+        x, y = self.pos
+        horizon = self.lookahead * 4
+        for fruit in game.fruits:
+            if fruit.sliced or not (0 < fruit.y < self.height) or not self.is_clear(game, fruit):
+                continue
+            ticks_left = game.trajectories.ticks_until_exit(fruit, self.height, horizon)
+            travel = math.hypot(fruit.x - x, fruit.y - y) / self.speed
+            if travel > ticks_left:
+                continue  # 已经来不及了
+            key = ticks_left + travel
+            if best_key is None or key < best_key:
+                best, best_key = fruit, key
+        return best
+
+    def is_clear(self, game, fruit):
+        """水果附近没有炸弹"""
+        limit = fruit.radius + self.bomb_margin
+        for bomb in game.bombs:
+            if math.hypot(bomb.x - fruit.x, bomb.y - fruit.y) < bomb.radius + limit:
+                return False
+        return True
+
+    def is_safe(self, game, start, end):
+        """轨迹不会碰到任何炸弹，且接下来两帧也没有炸弹飞进这片区域"""
+        for bomb in game.bombs:
+            if game.line_segment_intersects_circle(start[0], start[1], end[0], end[1],
+                                                   bomb.x, bomb.y, bomb.radius + self.bomb_margin):
+                return False
+        margin = 30 + self.bomb_margin
+        region = (min(start[0], end[0]) - margin, min(start[1], end[1]) - margin,
+                  max(start[0], end[0]) + margin, max(start[1], end[1]) + margin)
+        return not game.trajectories.entities_in_region(game.bombs, region, 2)
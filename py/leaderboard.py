@@ -0,0 +1,334 @@
+import argparse
+import csv
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from array import array
+from collections import namedtuple
+from concurrent.futures import Future
+
+# 一条成绩记录
+ScoreEntry = namedtuple("ScoreEntry", "id difficulty week device score combo level created")
+
+EXPORT_FIELDS = ["difficulty", "week", "device", "score", "combo", "level", "created"]
+
+INDEXES = {
+    "scores_week": "difficulty, week, score DESC",
+    "scores_device": "difficulty, device, week, score DESC",
+    "scores_all": "difficulty, score DESC",
+}
+
+
+def current_week(timestamp=None):
+    """ISO 周编号，如 2024-W07"""
+    return time.strftime("%G-W%V", time.localtime(timestamp))
+
+
+# 按分数计数的树状数组（Fenwick tree），分数为非负整数
+# 插入和求名次都是 O(log M)（M 为最高分），不随成绩条数增长；容量按 2 的幂翻倍扩展
+class ScoreCounts:
+    def __init__(self):
+        self.size = 1
+        self.tree = array("q", [0, 0])  # 下标从 1 开始，tree[i] 统计分数在 [i - lowbit(i), i) 内的成绩数
+        self.total = 0
+
+    def add(self, score, count=1):
+        if score < 0:
+            raise ValueError(f"分数不能为负: {score}")
+        index = score + 1
+        while index > self.size:
+            # 容量为 2 的幂时，扩展一倍只需把新的最高位节点设为总数，其余新节点覆盖的区间都还是空的
+            self.tree.extend(array("q", bytes(8 * self.size)))
+            self.size *= 2
+            self.tree[self.size] = self.total
+        tree = self.tree
+        while index <= self.size:
+            tree[index] += count
+            index += index & -index
+        self.total += count
+
+    def count_at_most(self, score):
+        """分数不高于 score 的成绩数"""
+        if score < 0:
+            return 0
+        index = min(score + 1, self.size)
+        tree = self.tree
+        result = 0
+        while index:
+            result += tree[index]
+            index -= index & -index
+        return result
+
+    def __len__(self):
+        return self.total
+
+
+# 本地排行榜：成绩存在带索引的 SQLite 表中，按（难度, 周, 设备）分榜
+# week/device 为 None 表示不限（如全时段榜、全部设备榜）
+#   - 前 K 名：首次查询后缓存在内存，新成绩进入前 K 时直接更新缓存
+#   - 名次：每个榜单在内存中维护一份按分数计数的树状数组，插入和求名次都是 O(log M)
+#   - 分页：按 (score DESC, id) 走索引取一页
+# 连接只能在创建它的线程中使用；游戏中通过 LeaderboardWriter 在后台线程访问
+class Leaderboard:
+    def __init__(self, path, top_k=10, device=None):
+        """
+        path: 数据库文件路径
+        top_k: 缓存的前几名数量
+        device: 本机设备名（默认取主机名）
+        """
+        self.path = path
+        self.top_k = top_k
+        self.device = device or socket.gethostname()
+        self.top_cache = {}  # 榜单 -> 前 K 名
+        self.rank_index = {}  # 榜单 -> 按分数计数的树状数组
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS scores (
+                id INTEGER PRIMARY KEY,
+                difficulty TEXT NOT NULL,
+                week TEXT NOT NULL,
+                device TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                combo INTEGER NOT NULL DEFAULT 0,
+                level INTEGER NOT NULL DEFAULT 1,
+                created REAL NOT NULL
+            )""")
+        self.create_indexes()
+        self.connection.commit()
+
+    def create_indexes(self):
+        # 覆盖所有分榜方式的索引（分数降序，便于取前 K 名和分页）
+        for name, columns in INDEXES.items():
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON scores ({columns})")
+
+    @staticmethod
+    def where(difficulty, week, device):
+        clauses = ["difficulty = ?"]
+        params = [difficulty]
+        if week is not None:
+            clauses.append("week = ?")
+            params.append(week)
+        if device is not None:
+            clauses.append("device = ?")
+            params.append(device)
+        return " AND ".join(clauses), params
+
+    def boards(self, entry):
+        """一条成绩所属的全部榜单"""
+        for week in (entry.week, None):
+            for device in (entry.device, None):
+                yield entry.difficulty, week, device
+
+    def submit(self, difficulty, score, combo=0, level=1, week=None, device=None, created=None):
+        """记录一局成绩，返回该成绩在本周本难度榜上的名次"""
+        if score < 0:
+            raise ValueError(f"分数不能为负: {score}")
+        created = time.time() if created is None else created
+        week = week or current_week(created)
+        device = device or self.device
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO scores (difficulty, week, device, score, combo, level, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", (difficulty, week, device, score, combo, level, created))
+        entry = ScoreEntry(cursor.lastrowid, difficulty, week, device, score, combo, level, created)
+        self.add_to_caches(entry)
+        return self.rank(difficulty, score, week=week)
+
+    def add_to_caches(self, entry):
+        for board in self.boards(entry):
+            counts = self.rank_index.get(board)
+            if counts is not None:
+                counts.add(entry.score)
+            top = self.top_cache.get(board)
+            if top is not None and (len(top) < self.top_k or entry.score > top[-1].score):
+                top.append(entry)
+                top.sort(key=lambda e: (-e.score, e.id))
+                del top[self.top_k:]
+
+    def top(self, difficulty, week=None, device=None):
+        """前 K 名（按分数降序，同分先提交者在前）"""
+        board = (difficulty, week, device)
+        top = self.top_cache.get(board)
+        if top is None:
+            where, params = self.where(difficulty, week, device)
+            rows = self.connection.execute(f"SELECT * FROM scores WHERE {where} ORDER BY score DESC, id LIMIT ?",
+                                           params + [self.top_k])
+            top = self.top_cache[board] = [ScoreEntry(*row) for row in rows]
+        return list(top)
+
+    def scores(self, board):
+        """某个榜单的分数计数（首次使用时按分数分组从索引加载）"""
+        counts = self.rank_index.get(board)
+        if counts is None:
+            where, params = self.where(*board)
+            counts = ScoreCounts()
+            for score, count in self.connection.execute(
+                    f"SELECT score, COUNT(*) FROM scores WHERE {where} GROUP BY score", params):
+                counts.add(score, count)
+            self.rank_index[board] = counts
+        return counts
+
+    def rank(self, difficulty, score, week=None, device=None):
+        """该分数在榜单上的名次（1 起，同分并列）"""
+        counts = self.scores((difficulty, week, device))
+        return len(counts) - counts.count_at_most(score) + 1
+
+    def count(self, difficulty, week=None, device=None):
+        return len(self.scores((difficulty, week, device)))
+
+    def page(self, difficulty, page, page_size=20, week=None, device=None):
+        """第 page 页（从 0 开始）的成绩"""
+        where, params = self.where(difficulty, week, device)
+        rows = self.connection.execute(
+            f"SELECT * FROM scores WHERE {where} ORDER BY score DESC, id LIMIT ? OFFSET ?",
+            params + [page_size, page * page_size])
+        return [ScoreEntry(*row) for row in rows]
+
+    def page_of(self, difficulty, score, page_size=20, week=None, device=None):
+        """某个分数所在的页码"""
+        return (self.rank(difficulty, score, week, device) - 1) // page_size
+
+    def import_csv(self, path, batch_size=10000):
+        """批量导入 CSV（列见 EXPORT_FIELDS），返回导入条数
+        整个导入在一个事务中完成：任何一行出错（格式错误、I/O 错误）都会整体回滚，已删除的索引也随之恢复"""
+        total = 0
+        self.connection.execute("BEGIN")
+        try:
+            # 大量导入时先删除索引、导入后一次性重建，比逐行维护索引快得多
+            for name in INDEXES:
+                self.connection.execute(f"DROP INDEX IF EXISTS {name}")
+            with open(path, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                batch = []
+                for row in reader:
+                    if int(row["score"]) < 0:
+                        raise ValueError(f"分数不能为负: {row['score']}")
+                    created = float(row.get("created") or time.time())
+                    batch.append((row["difficulty"], row.get("week") or current_week(created),
+                                  row.get("device") or self.device, int(row["score"]), int(row.get("combo") or 0),
+                                  int(row.get("level") or 1), created))
+                    if len(batch) >= batch_size:
+                        total += self.insert_many(batch)
+                        batch = []
+                total += self.insert_many(batch)
+            self.create_indexes()
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        # 缓存整体失效，下次查询时重新加载
+        self.top_cache.clear()
+        self.rank_index.clear()
+        return total
+
+    def insert_many(self, rows):
+        """在当前事务中插入一批成绩（由调用方提交）"""
+        self.connection.executemany(
+            "INSERT INTO scores (difficulty, week, device, score, combo, level, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def export_csv(self, path, difficulty=None):
+        """导出全部（或某难度的）成绩到 CSV，返回导出条数"""
+        query = f"SELECT {', '.join(EXPORT_FIELDS)} FROM scores"
+        params = []
+        if difficulty:
+            query += " WHERE difficulty = ?"
+            params.append(difficulty)
+        total = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_FIELDS)
+            for row in self.connection.execute(query + " ORDER BY id", params):
+                writer.writerow(row)
+                total += 1
+        return total
+
+    def close(self):
+        self.connection.close()
+
+
+# 后台提交：游戏主循环只把成绩放进队列，写库、加载榜单和求名次都在后台线程完成（与 ProfileStore 相同的写入方式）
+class LeaderboardWriter:
+    def __init__(self, path, **options):
+        """options 原样传给 Leaderboard；数据库在后台线程中打开，打开失败时在这里抛出"""
+        self.queue = queue.Queue()
+        opened = Future()
+        self.writer = threading.Thread(target=self.write_loop, args=(path, options, opened),
+                                       name="leaderboard-writer", daemon=True)
+        self.writer.start()
+        opened.result()
+
+    def submit(self, difficulty, score, combo=0, level=1):
+        """提交一局成绩，立即返回 Future，完成后结果为 (本周名次, 本周该难度成绩总数)"""
+        created = time.time()
+        future = Future()
+        self.queue.put((future, (difficulty, score, combo, level, current_week(created), None, created)))
+        return future
+
+    def write_loop(self, path, options, opened):
+        try:
+            board = Leaderboard(path, **options)
+        except BaseException as error:
+            opened.set_exception(error)
+            return
+        opened.set_result(None)
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            future, entry = item
+            difficulty, week = entry[0], entry[4]
+            try:
+                rank = board.submit(*entry)
+                future.set_result((rank, board.count(difficulty, week=week)))
+            except Exception as error:
+                future.set_exception(error)
+        board.close()
+
+    def close(self):
+        """处理完已提交的成绩并结束后台线程"""
+        self.queue.put(None)
+        self.writer.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地排行榜")
+    parser.add_argument("--db", default="save/leaderboard.db", help="排行榜数据库路径")
+    parser.add_argument("--difficulty", default="medium")
+    parser.add_argument("--week", help="只看某一周，如 2024-W07（默认全时段）")
+    parser.add_argument("--device", help="只看某台设备")
+    parser.add_argument("--top", type=int, default=10, help="显示前几名")
+    parser.add_argument("--rank", type=int, help="查询该分数的名次")
+    parser.add_argument("--import-csv", help="从 CSV 批量导入")
+    parser.add_argument("--export-csv", help="导出到 CSV")
+    args = parser.parse_args()
+
+    board = Leaderboard(args.db, top_k=args.top)
+    if args.import_csv:
+        start = time.perf_counter()
+        count = board.import_csv(args.import_csv)
+        print(f"导入 {count} 条，用时 {time.perf_counter() - start:.1f} 秒")
+    if args.export_csv:
+        print(f"导出 {board.export_csv(args.export_csv)} 条")
+
+    for i, entry in enumerate(board.top(args.difficulty, args.week, args.device), 1):
+        print(f"{i:3d}. {entry.score:6d}  连击 {entry.combo:3d}  等级 {entry.level:3d}  {entry.week}  {entry.device}")
+    if args.rank is not None:
+        rank = board.rank(args.difficulty, args.rank, args.week, args.device)
+        total = board.count(args.difficulty, args.week, args.device)
+        print(f"分数 {args.rank} 排名第 {rank} / {total}")
+    board.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,275 @@
+import argparse
+import json
+import math
+import os
+import time
+
+import mnist_data
+import runtime_config
+
+# oneDNN 开关只在导入 TensorFlow 时读取，这里按命令行 --runtime-config 指定的配置文件（默认配置文件）/ 环境变量提前设置
+runtime_config.apply_onednn(runtime_config.load(runtime_config.path_from_argv()))
+
 import tensorflow as tf
-from tensorflow.keras.datasets import mnist
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.utils import to_categorical
-
-# 加载MNIST数据集
-(x_train, y_train), (x_test, y_test) = mnist.load_data()
-
-# 数据预处理
-x_train = x_train / 255.0
-x_test = x_test / 255.0
-
-# 将标签转换为独热编码
-y_train = to_categorical(y_train, 10)
-y_test = to_categorical(y_test, 10)
-
-# 构建LSTM模型
-model = Sequential([
-    LSTM(128, input_shape=(x_train.shape[1:]), return_sequences=True),
-    Dropout(0.2),
-    LSTM(128),
-    Dropout(0.2),
-    Dense(64, activation='relu'),
-    Dropout(0.2),
-    Dense(10, activation='softmax')
-])
-
-# 编译模型
-model.compile(
-    loss='categorical_crossentropy',
-    optimizer='adam',
-    metrics=['accuracy']
-)
-
-# 训练模型
-history = model.fit(
-    x_train, y_train,
-    epochs=10,
-    batch_size=64,
-    validation_data=(x_test, y_test)
-)
-
-# 评估模型
-test_loss, test_accuracy = model.evaluate(x_test, y_test)
-print(f"测试准确率: {test_accuracy * 100:.2f}%")
-
-import matplotlib.pyplot as plt
-
-# 绘制训练和验证准确率曲线
-plt.figure(figsize=(12, 4))
-plt.subplot(1, 2, 1)
-plt.plot(history.history['accuracy'])
-plt.plot(history.history['val_accuracy'])
-plt.title('Model Accuracy')
-plt.ylabel('Accuracy')
-plt.xlabel('Epoch')
-plt.legend(['Train', 'Validation'], loc='lower right')
-
-# 绘制训练和验证损失曲线
-plt.subplot(1, 2, 2)
-plt.plot(history.history['loss'])
-plt.plot(history.history['val_loss'])
-plt.title('Model Loss')
-plt.ylabel('Loss')
-plt.xlabel('Epoch')
-plt.legend(['Train', 'Validation'], loc='upper right')
-plt.tight_layout()
-plt.show()
-
-# 保存模型
-model.save('lstm_mnist_model.h5')
\ No newline at end of file
+from tensorflow.keras.layers import LSTM, Dense, Dropout, Rescaling
+
+try:
+    import resource
+except ImportError:  # Windows 上没有 resource 模块，不统计峰值内存
+    resource = None
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+def load_data(data_dir=mnist_data.DEFAULT_DIR, source=None):
+    # 加载MNIST数据集：从本地 .npy 缓存内存映射（见 mnist_data.py），不再每次解压 npz
+    # 图像保持 uint8（训练集约 47 MB，转成 float64 则要 376 MB），标签为整数（稀疏标签）
+    return mnist_data.load(data_dir, source)
+
+
+def make_dataset(x, y, batch_size, shuffle=False, seed=None):
+    """tf.data 输入管道：from_tensor_slices → cache → shuffle → batch → prefetch
+    数据以 uint8 缓存和传递，归一化由模型的 Rescaling 层在每个批次上完成，prefetch 让数据准备与训练计算重叠"""
+    dataset = tf.data.Dataset.from_tensor_slices((x, y)).cache()
+    if shuffle:
+        dataset = dataset.shuffle(len(x), seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(AUTOTUNE)
+
+
+def learning_rate_schedule(name, initial, total_steps):
+    """学习率：constant 固定不变；cosine 按余弦曲线在 total_steps 步内从 initial 降到 initial 的 5%
+    constant 也用调度对象（衰减率为 1 的指数衰减）表示：用调度创建的优化器只能再换成调度，
+    这样恢复检查点时两种方式都能按本次的参数重新设定"""
+    if name == "cosine":
+        return tf.keras.optimizers.schedules.CosineDecay(initial, total_steps, alpha=0.05)
+    return tf.keras.optimizers.schedules.ExponentialDecay(initial, total_steps, decay_rate=1.0)
+
+
+def build_model(input_shape, learning_rate=1e-3, units=128, layers=2, dense_units=64, dropout=0.2):
+    # 构建LSTM模型（输入为 0~255 的 uint8 图像，第一层换算成 0~1 的 float32）
+    # layers 层 LSTM（每层 units 个单元）→ Dense(dense_units) → Dense(10)，每层之后接 Dropout
+    stack = [tf.keras.Input(shape=input_shape), Rescaling(1 / 255.0)]
+    for index in range(layers):
+        stack += [LSTM(units, return_sequences=index < layers - 1), Dropout(dropout)]
+    stack += [Dense(dense_units, activation='relu'), Dropout(dropout), Dense(10, activation='softmax')]
+    model = Sequential(stack)
+
+    # 编译模型
+    model.compile(
+        loss='sparse_categorical_crossentropy',
+        optimizer=tf.keras.optimizers.Adam(learning_rate),
+        metrics=['accuracy']
+    )
+    return model
+
+
+# 记录每轮训练的耗时和吞吐量（steps/sec）
+class ThroughputCallback(tf.keras.callbacks.Callback):
+    def __init__(self, steps_per_epoch):
+        super().__init__()
+        self.steps_per_epoch = steps_per_epoch
+        self.epoch_times = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch_start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self.epoch_start
+        self.epoch_times.append(elapsed)
+        print(f"第 {epoch + 1} 轮用时 {elapsed:.1f} 秒，{self.steps_per_epoch / elapsed:.1f} steps/sec")
+
+
+def atomic_save(path, save):
+    """先写到同目录的临时文件再替换，保存到一半被中断也不会损坏已有的文件"""
+    temp = os.path.join(os.path.dirname(path), "tmp-" + os.path.basename(path))
+    save(temp)
+    os.replace(temp, path)
+
+
+# 断点续训 + 提前停止：
+#   每轮结束保存完整模型（权重 + 优化器状态，含学习率进度）和训练状态（轮数、最好的 val_loss、历史曲线、模型参数）
+#   val_loss 创新低时另存一份最好的权重；连续 patience 轮没有改善则停止训练，结束时恢复最好的权重
+class TrainingCheckpoint(tf.keras.callbacks.Callback):
+    LATEST = "latest.keras"
+    BEST = "best.weights.h5"
+    STATE = "state.json"
+    ARCHITECTURE = ("units", "layers", "dense_units", "dropout")  # 与检查点不同时无法继续训练
+    LEARNING_RATE = ("learning_rate", "lr_schedule")  # 与检查点不同时按本次的参数继续
+
+    def __init__(self, directory, patience=3, min_delta=0.0, config=None):
+        """config: 本次训练的结构和学习率参数（键见 ARCHITECTURE / LEARNING_RATE），保存在状态中供恢复时核对"""
+        super().__init__()
+        self.directory = directory
+        self.patience = patience
+        self.min_delta = min_delta
+        self.config = config or {}
+        self.state = {"epoch": 0, "best": None, "wait": 0, "stopped": False, "history": {}, "config": self.config}
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def restore(self):
+        """有上次的检查点时加载模型并恢复训练状态，返回模型；没有则返回 None"""
+        if not (os.path.exists(self.path(self.STATE)) and os.path.exists(self.path(self.LATEST))):
+            return None
+        with open(self.path(self.STATE), encoding="utf-8") as f:
+            state = json.load(f)
+        saved = state.get("config", {})
+        changed = [key for key in self.ARCHITECTURE if key in saved and key in self.config
+                   and saved[key] != self.config[key]]
+        if changed:
+            raise SystemExit(f"检查点 {self.directory} 的模型结构与本次参数不同（"
+                             + "，".join(f"{key}: {saved[key]} → {self.config[key]}" for key in changed)
+                             + "），请使用 --no-resume 从头训练或换一个 --checkpoint-dir")
+        for key in self.LEARNING_RATE:
+            if key in saved and key in self.config and saved[key] != self.config[key]:
+                print(f"注意：{key} 与检查点不同（{saved[key]} → {self.config[key]}），按本次的参数继续训练")
+        self.state = {**state, "config": self.config}
+        print(f"从检查点恢复：已完成 {self.state['epoch']} 轮，最好的 val_loss {self.state['best']}")
+        return tf.keras.models.load_model(self.path(self.LATEST))
+
+    def on_epoch_end(self, epoch, logs=None):
+        logs = logs or {}
+        logs = {**logs, "learning_rate": float(self.model.optimizer.learning_rate)}
+        for name, value in logs.items():
+            self.state["history"].setdefault(name, []).append(float(value))
+
+        val_loss = logs["val_loss"]
+        if self.state["best"] is None or val_loss < self.state["best"] - self.min_delta:
+            self.state["best"] = val_loss
+            self.state["wait"] = 0
+            atomic_save(self.path(self.BEST), self.model.save_weights)
+        else:
+            self.state["wait"] += 1
+            if self.state["wait"] >= self.patience:
+                self.state["stopped"] = True
+                self.model.stop_training = True
+                print(f"val_loss 连续 {self.patience} 轮没有改善，提前停止")
+
+        # 先保存模型再保存状态：中断在两者之间时，恢复后最多重复训练一轮
+        self.state["epoch"] = epoch + 1
+        atomic_save(self.path(self.LATEST), self.model.save)
+        atomic_save(self.path(self.STATE), self.save_state)
+
+    def save_state(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+
+    def on_train_end(self, logs=None):
+        if self.state["best"] is not None and os.path.exists(self.path(self.BEST)):
+            self.model.load_weights(self.path(self.BEST))
+            print(f"已恢复 val_loss 最低（{self.state['best']:.4f}）的权重")
+
+
+def plot_history(history):
+    import matplotlib.pyplot as plt
+
+    # 绘制训练和验证准确率曲线
+    plt.figure(figsize=(12, 4))
+    plt.subplot(1, 2, 1)
+    plt.plot(history['accuracy'])
+    plt.plot(history['val_accuracy'])
+    plt.title('Model Accuracy')
+    plt.ylabel('Accuracy')
+    plt.xlabel('Epoch')
+    plt.legend(['Train', 'Validation'], loc='lower right')
+
+    # 绘制训练和验证损失曲线
+    plt.subplot(1, 2, 2)
+    plt.plot(history['loss'])
+    plt.plot(history['val_loss'])
+    plt.title('Model Loss')
+    plt.ylabel('Loss')
+    plt.xlabel('Epoch')
+    plt.legend(['Train', 'Validation'], loc='upper right')
+    plt.tight_layout()
+    plt.show()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="LSTM 手写数字识别训练")
+    parser.add_argument("--pipeline", choices=["tfdata", "numpy"], default="tfdata",
+                        help="输入方式：tf.data 管道，或直接把 NumPy 数组交给 fit（用于对比）")
+    parser.add_argument("--epochs", type=int, default=10, help="最多训练的轮数（含恢复前已完成的轮数）")
+    parser.add_argument("--batch-size", type=int, help="批大小（默认取运行配置，未调优时为 64）")
+    parser.add_argument("--intra-op-threads", type=int, help="单个运算内部的并行线程数（0 为自动）")
+    parser.add_argument("--inter-op-threads", type=int, help="可同时执行的运算数（0 为自动）")
+    parser.add_argument("--runtime-config", default=runtime_config.DEFAULT_PATH,
+                        help="运行配置文件（python runtime_config.py 自动调优生成）")
+    parser.add_argument("--seed", type=int, help="打乱数据的随机种子")
+    parser.add_argument("--data-dir", default=mnist_data.DEFAULT_DIR, help="本地 MNIST 缓存目录")
+    parser.add_argument("--mnist-source", help="缓存不存在时从该 mnist.npz 转换（离线环境使用）")
+    parser.add_argument("--units", type=int, default=128, help="每层 LSTM 的单元数")
+    parser.add_argument("--layers", type=int, default=2, help="LSTM 层数")
+    parser.add_argument("--dense-units", type=int, default=64, help="全连接隐藏层的单元数")
+    parser.add_argument("--dropout", type=float, default=0.2, help="每层之后的 Dropout 比例")
+    parser.add_argument("--learning-rate", type=float, default=1e-3, help="初始学习率")
+    parser.add_argument("--lr-schedule", choices=["cosine", "constant"], default="cosine", help="学习率调度")
+    parser.add_argument("--patience", type=int, default=3, help="val_loss 连续多少轮没有改善就停止")
+    parser.add_argument("--checkpoint-dir", default="checkpoints/lstm_mnist", help="检查点目录")
+    parser.add_argument("--no-resume", action="store_true", help="忽略已有的检查点，从头训练")
+    parser.add_argument("--output", default="lstm_mnist_model.h5", help="模型保存路径")
+    parser.add_argument("--no-plot", action="store_true", help="不显示训练曲线")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = runtime_config.load(args.runtime_config)
+    for key in ("batch_size", "intra_op_threads", "inter_op_threads"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    runtime_config.apply_threads(config)
+    args.batch_size = config["batch_size"]
+    print(f"运行配置：{runtime_config.describe(config)}")
+
+    (x_train, y_train), (x_test, y_test) = load_data(args.data_dir, args.mnist_source)
+    steps_per_epoch = math.ceil(len(x_train) / args.batch_size)
+    throughput = ThroughputCallback(steps_per_epoch)
+    model_config = {key: getattr(args, key)
+                    for key in TrainingCheckpoint.ARCHITECTURE + TrainingCheckpoint.LEARNING_RATE}
+    checkpoint = TrainingCheckpoint(args.checkpoint_dir, args.patience, config=model_config)
+    learning_rate = learning_rate_schedule(args.lr_schedule, args.learning_rate, args.epochs * steps_per_epoch)
+    model = None if args.no_resume else checkpoint.restore()
+    if model is None:
+        model = build_model(x_train.shape[1:], learning_rate, args.units, args.layers, args.dense_units, args.dropout)
+    else:
+        # 按本次的 --learning-rate / --lr-schedule / --epochs 重新设定学习率；
+        # 优化器的步数已从检查点恢复，调度从当前进度继续
+        model.optimizer.learning_rate = learning_rate
+    # 已经提前停止的训练不再继续，只做评估和保存
+    initial_epoch = args.epochs if checkpoint.state["stopped"] else checkpoint.state["epoch"]
+    callbacks = [throughput, checkpoint]
+
+    # 训练模型
+    if args.pipeline == "tfdata":
+        train = make_dataset(x_train, y_train, args.batch_size, shuffle=True, seed=args.seed)
+        test = make_dataset(x_test, y_test, args.batch_size)
+        model.fit(train, epochs=args.epochs, initial_epoch=initial_epoch, validation_data=test, callbacks=callbacks)
+        test_loss, test_accuracy = model.evaluate(test)
+    else:
+        model.fit(x_train, y_train, epochs=args.epochs, initial_epoch=initial_epoch, batch_size=args.batch_size,
+                  validation_data=(x_test, y_test), callbacks=callbacks)
+        test_loss, test_accuracy = model.evaluate(x_test, y_test)
+
+    # 评估模型
+    print(f"测试准确率: {test_accuracy * 100:.2f}%")
+    if throughput.epoch_times:
+        average = sum(throughput.epoch_times) / len(throughput.epoch_times)
+        print(f"输入方式 {args.pipeline}：平均每轮 {average:.1f} 秒，"
+              f"{throughput.steps_per_epoch / average:.1f} steps/sec")
+    if resource:
+        # Linux 上 ru_maxrss 单位为 KB
+        print(f"峰值内存 (RSS): {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    if not args.no_plot and checkpoint.state["history"]:
+        plot_history(checkpoint.state["history"])
+
+    # 保存模型
+    model.save(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import mnist_data
+
+# 单机多进程数据并行训练（MultiWorkerMirroredStrategy）：
+#   启动器为每个 worker 分配本地端口、生成 TF_CONFIG，再以子进程运行本脚本的 worker 模式
+#   每个 worker 持有一份完整模型，按样本分片读取数据，梯度每步通过 all-reduce 同步
+#   全局批大小 = 每个 worker 的批大小 × worker 数
+
+
+def free_ports(count):
+    sockets = [socket.socket() for _ in range(count)]
+    for s in sockets:
+        s.bind(("localhost", 0))
+    ports = [s.getsockname()[1] for s in sockets]
+    for s in sockets:
+        s.close()
+    return ports
+
+
+def cluster_spec(workers):
+    return {"worker": [f"localhost:{port}" for port in free_ports(workers)]}
+
+
+def launch(workers, args, result_path=None):
+    """启动 workers 个 worker 进程并等待全部结束；任一进程失败时结束其余进程并抛出异常
+    args 为转发给 worker 的命令行参数；返回 chief（0 号 worker）写出的结果"""
+    cluster = cluster_spec(workers)
+    result_path = result_path or os.path.join(tempfile.mkdtemp(), "result.json")
+    processes = []
+    for index in range(workers):
+        env = dict(os.environ, TF_CONFIG=json.dumps({"cluster": cluster, "task": {"type": "worker", "index": index}}))
+        command = [sys.executable, os.path.abspath(__file__), "--worker", "--result", result_path, *args]
+        processes.append(subprocess.Popen(command, env=env))
+
+    try:
+        while processes:
+            for process in list(processes):
+                code = process.poll()
+                if code is None:
+                    continue
+                processes.remove(process)
+                if code != 0:
+                    raise RuntimeError(f"worker 进程退出码 {code}")
+            time.sleep(0.2)
+    finally:
+        for process in processes:
+            process.kill()
+
+    with open(result_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def train_worker(args):
+    # TensorFlow 只在 worker 进程里导入，启动器不占用额外内存
+    import tensorflow as tf
+    from lstm_mnist import build_model, load_data, make_dataset
+
+    if args.threads:
+        tf.config.threading.set_intra_op_parallelism_threads(args.threads)
+    strategy = tf.distribute.MultiWorkerMirroredStrategy()
+    workers = strategy.num_replicas_in_sync
+    task_index = json.loads(os.environ["TF_CONFIG"])["task"]["index"]
+    chief = task_index == 0
+
+    (x_train, y_train), (x_test, y_test) = load_data(args.data_dir, args.mnist_source)
+    global_batch_size = args.batch_size * workers
+    # 所有 worker 每轮必须执行相同的步数（每步都有 all-reduce），丢弃最后不满一批的样本
+    steps_per_epoch = len(x_train) // global_batch_size
+
+    # 按样本分片：各 worker 用相同的种子打乱，再各取属于自己的那一份，互不重叠
+    options = tf.data.Options()
+    options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.DATA
+    train = make_dataset(x_train, y_train, global_batch_size, shuffle=True, seed=args.seed).repeat()
+    iterator = iter(strategy.experimental_distribute_dataset(train.with_options(options)))
+
+    with strategy.scope():
+        model = build_model(x_train.shape[1:])
+        loss_fn = tf.keras.losses.SparseCategoricalCrossentropy(reduction="none")
+
+    # 自定义训练循环：Keras 3 的 fit 在 MultiWorkerMirroredStrategy 下会对 (x, y) 批次整体做 reduce 而报错
+    @tf.function
+    def train_step(iterator):
+        def step(images, labels):
+            with tf.GradientTape() as tape:
+                probabilities = model(images, training=True)
+                loss = tf.nn.compute_average_loss(loss_fn(labels, probabilities), global_batch_size=global_batch_size)
+            gradients = tape.gradient(loss, model.trainable_variables)
+            model.optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+            return loss
+
+        return strategy.reduce("SUM", strategy.run(step, args=next(iterator)), axis=None)
+
+    epoch_times = []
+    for epoch in range(args.epochs):
+        start = time.perf_counter()
+        total = 0.0
+        for _ in range(steps_per_epoch):
+            total += float(train_step(iterator))
+        epoch_times.append(time.perf_counter() - start)
+        if chief:
+            print(f"第 {epoch + 1} 轮用时 {epoch_times[-1]:.1f} 秒，{steps_per_epoch / epoch_times[-1]:.1f} steps/sec，"
+                  f"loss {total / steps_per_epoch:.4f}", flush=True)
+    if chief:
+        write_result(args, model, x_test, y_test, epoch_times, steps_per_epoch, global_batch_size, workers)
+    # 最后一次 all-reduce 作为屏障：其他 worker 等 chief 保存完再一起退出，避免 chief 认为它们已崩溃
+    strategy.reduce("SUM", strategy.run(lambda: tf.constant(1)), axis=None)
+
+
+def write_result(args, model, x_test, y_test, epoch_times, steps_per_epoch, global_batch_size, workers):
+    """chief 评估并保存模型，把吞吐量等结果写给启动器（各 worker 的权重每步同步后完全一致）"""
+    import numpy as np
+
+    predictions = np.concatenate([np.argmax(model(np.asarray(x_test[start:start + 1024]), training=False), axis=1)
+                                  for start in range(0, len(x_test), 1024)])
+    test_accuracy = float(np.mean(predictions == y_test))
+    model.save(args.output)
+
+    # 第一轮包含图构建和 all-reduce 初始化，有多轮时不计入吞吐量
+    times = epoch_times[1:] or epoch_times
+    result = {
+        "workers": workers,
+        "global_batch_size": global_batch_size,
+        "epoch_times": epoch_times,
+        "images_per_sec": steps_per_epoch * global_batch_size / (sum(times) / len(times)),
+        "test_accuracy": test_accuracy,
+    }
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+def benchmark(worker_counts, args, forwarded):
+    """依次用不同的 worker 数训练，报告吞吐量和相对单进程的加速比"""
+    results = []
+    for workers in worker_counts:
+        threads = args.threads or max(1, (os.cpu_count() or 1) // workers)
+        results.append(launch(workers, [*forwarded, "--threads", str(threads)]))
+
+    base = results[0]["images_per_sec"] / results[0]["workers"]
+    print(f"{'worker 数':>8s} {'全局批大小':>10s} {'吞吐(张/秒)':>12s} {'加速比':>8s} {'扩展效率':>8s} {'测试准确率':>10s}")
+    for result in results:
+        speedup = result["images_per_sec"] / base
+        print(f"{result['workers']:8d} {result['global_batch_size']:10d} {result['images_per_sec']:12.0f} "
+              f"{speedup:8.2f} {speedup / result['workers'] * 100:7.1f}% {result['test_accuracy'] * 100:9.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LSTM 手写数字识别：单机多进程数据并行训练")
+    parser.add_argument("--workers", type=int, default=2, help="worker 进程数")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=64, help="每个 worker 的批大小（全局批大小为其 worker 数倍）")
+    parser.add_argument("--seed", type=int, default=0, help="打乱数据的随机种子（所有 worker 必须相同）")
+    parser.add_argument("--threads", type=int, help="每个 worker 的 intra-op 线程数（默认 CPU 核数 / worker 数）")
+    parser.add_argument("--data-dir", default=mnist_data.DEFAULT_DIR, help="本地 MNIST 缓存目录")
+    parser.add_argument("--mnist-source", help="缓存不存在时从该 mnist.npz 转换（离线环境使用）")
+    parser.add_argument("--output", default="lstm_mnist_model.h5", help="模型保存路径（只由 chief 写入）")
+    parser.add_argument("--benchmark", type=int, nargs="+", metavar="N", help="依次用这些 worker 数训练并对比吞吐量")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        train_worker(args)
+        return
+
+    # 先在启动器里准备好缓存，避免多个 worker 同时转换
+    mnist_data.load(args.data_dir, args.mnist_source)
+    forwarded = ["--epochs", str(args.epochs), "--batch-size", str(args.batch_size), "--seed", str(args.seed),
+                 "--data-dir", args.data_dir, "--output", args.output]
+    if args.benchmark:
+        with tempfile.TemporaryDirectory() as directory:
+            # 基准测试不覆盖正式模型
+            forwarded[-1] = os.path.join(directory, "benchmark.h5")
+            benchmark(args.benchmark, args, forwarded)
+        return
+
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    result = launch(args.workers, [*forwarded, "--threads", str(threads)])
+    print(f"{result['workers']} 个 worker，全局批大小 {result['global_batch_size']}："
+          f"{result['images_per_sec']:.0f} 张/秒，测试准确率 {result['test_accuracy'] * 100:.2f}%")
+    print(f"模型已保存到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
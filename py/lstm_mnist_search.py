@@ -0,0 +1,240 @@
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+
+import mnist_data
+import runtime_config
+
+# LSTM 结构的超参数搜索：
+#   从搜索空间随机抽取 --trials 组配置，先在主进程里测每种结构的单张推理延迟（只与结构有关，与权重无关）
+#   再用 successive halving 逐轮训练：每一轮所有存活的配置都训练到该轮的轮数，
+#   按（准确率, 延迟）的 Pareto 层级排序，只保留前 1/eta 进入下一轮；超出延迟 SLO 的配置直接淘汰
+#   训练在多个 worker 进程中并行，每组配置的模型（含优化器状态）保存在搜索目录里，下一轮接着训练
+SEARCH_SPACE = {
+    "units": [32, 64, 128, 192],
+    "layers": [1, 2, 3],
+    "dense_units": [32, 64, 128],
+    "dropout": [0.0, 0.1, 0.2, 0.3],
+}
+LOG = "trials.jsonl"
+RESULTS = "results.json"
+
+
+def sample_configs(count, seed):
+    """不重复地随机抽取 count 组配置（count 不小于搜索空间大小时返回全部组合）"""
+    configs = [dict(zip(SEARCH_SPACE, values)) for values in itertools.product(*SEARCH_SPACE.values())]
+    random.Random(seed).shuffle(configs)
+    return configs[:count]
+
+
+def epoch_schedule(min_epochs, max_epochs, eta):
+    """每一轮训练到的累计轮数，例如 1, 3, 9"""
+    if min_epochs < 1 or eta < 2:
+        raise ValueError(f"min_epochs 至少为 1、eta 至少为 2（当前为 {min_epochs}、{eta}），否则轮数不会增长")
+    schedule = [min_epochs]
+    while schedule[-1] < max_epochs:
+        schedule.append(min(schedule[-1] * eta, max_epochs))
+    return schedule
+
+
+def dominates(a, b):
+    """a 的准确率不低于 b 且延迟不高于 b，并且至少有一项严格更好"""
+    return (a["val_accuracy"] >= b["val_accuracy"] and a["latency_ms"] <= b["latency_ms"]
+            and (a["val_accuracy"] > b["val_accuracy"] or a["latency_ms"] < b["latency_ms"]))
+
+
+def pareto_front(trials):
+    return [trial for trial in trials if not any(dominates(other, trial) for other in trials)]
+
+
+def pareto_ranks(trials):
+    """非支配排序：第一层 Pareto 前沿为 0，去掉后剩下的前沿为 1，依此类推。返回 {trial id: 层级}"""
+    ranks = {}
+    remaining = list(trials)
+    rank = 0
+    while remaining:
+        front = pareto_front(remaining)
+        for trial in front:
+            ranks[trial["trial"]] = rank
+        remaining = [trial for trial in remaining if trial["trial"] not in ranks]
+        rank += 1
+    return ranks
+
+
+def measure_latency(config, runs=50):
+    """单张图像推理延迟的中位数（毫秒），在主进程中依次测量，不受训练进程干扰"""
+    import numpy as np
+    import tensorflow as tf
+    from lstm_mnist import build_model
+    from mnist_inference import IMAGE_SHAPE
+
+    model = build_model(IMAGE_SHAPE, **config)
+    predict = tf.function(lambda images: model(images, training=False),
+                          input_signature=[tf.TensorSpec([1, *IMAGE_SHAPE], tf.float32)])
+    image = tf.constant(np.zeros((1, *IMAGE_SHAPE), dtype=np.float32))
+    for _ in range(5):
+        predict(image)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        predict(image).numpy()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times)), model.count_params()
+
+
+def init_worker(threads):
+    runtime_config.apply_threads({"intra_op_threads": threads, "inter_op_threads": 1})
+
+
+def train_trial(task):
+    """在 worker 进程中把一组配置训练到 task["epochs"] 轮（从上一轮保存的模型继续），返回验证结果"""
+    import tensorflow as tf
+    from lstm_mnist import atomic_save, build_model, load_data, make_dataset
+
+    (x_train, y_train), _ = load_data(task["data_dir"])
+    # 从训练集末尾留出验证集，测试集不参与选择
+    split = len(x_train) - task["val_size"]
+    train = make_dataset(x_train[:split], y_train[:split], task["batch_size"], shuffle=True, seed=task["seed"])
+    val = make_dataset(x_train[split:], y_train[split:], task["batch_size"])
+
+    path = os.path.join(task["directory"], f"trial-{task['trial']:03d}.keras")
+    if task["done"]:
+        model = tf.keras.models.load_model(path)
+    else:
+        model = build_model(x_train.shape[1:], **task["config"])
+    start = time.perf_counter()
+    model.fit(train, epochs=task["epochs"], initial_epoch=task["done"], verbose=0)
+    train_time = time.perf_counter() - start
+    val_loss, val_accuracy = model.evaluate(val, verbose=0)
+    atomic_save(path, model.save)
+    return {"trial": task["trial"], "epochs": task["epochs"], "val_accuracy": float(val_accuracy),
+            "val_loss": float(val_loss), "train_time": train_time}
+
+
+def new_run_id():
+    """本次搜索的编号（时间 + 进程号），写进每一行日志，便于区分不同次运行"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+
+def search(args, run_id):
+    # 搜索目录里的模型按 trial 编号命名，不同次运行会互相覆盖，所以只接受空目录
+    if os.path.isdir(args.search_dir) and os.listdir(args.search_dir):
+        raise SystemExit(f"搜索目录 {args.search_dir} 不为空（可能是上一次搜索的结果），请换一个 --search-dir 或先清空")
+    os.makedirs(args.search_dir, exist_ok=True)
+    log_path = os.path.join(args.search_dir, LOG)
+    trials = []
+    for index, config in enumerate(sample_configs(args.trials, args.seed)):
+        latency, params = measure_latency(config)
+        trials.append({"trial": index, "config": config, "params": params, "latency_ms": latency,
+                       "epochs": 0, "val_accuracy": 0.0, "train_time": 0.0, "status": "running"})
+        print(f"trial {index:3d} {config} 参数量 {params}，单张延迟 {latency:.2f} ms", flush=True)
+
+    survivors = []
+    for trial in trials:
+        if args.latency_slo and trial["latency_ms"] > args.latency_slo:
+            trial["status"] = "slo"
+        else:
+            survivors.append(trial)
+
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    context = multiprocessing.get_context("spawn")  # TensorFlow 不能在 fork 出的子进程里安全使用
+    schedule = epoch_schedule(args.min_epochs, args.max_epochs, args.eta)
+    with context.Pool(args.workers, initializer=init_worker, initargs=(threads,)) as pool, \
+            open(log_path, "w", encoding="utf-8") as log:
+        for rung, epochs in enumerate(schedule):
+            tasks = [{"trial": trial["trial"], "config": trial["config"], "done": trial["epochs"], "epochs": epochs,
+                      "directory": args.search_dir, "data_dir": args.data_dir, "batch_size": args.batch_size,
+                      "val_size": args.val_size, "seed": args.seed} for trial in survivors]
+            by_id = {trial["trial"]: trial for trial in survivors}
+            for result in pool.imap_unordered(train_trial, tasks):
+                trial = by_id[result["trial"]]
+                trial["epochs"] = result["epochs"]
+                trial["val_accuracy"] = result["val_accuracy"]
+                trial["train_time"] += result["train_time"]
+                log.write(json.dumps({"run_id": run_id, **result, "rung": rung, "config": trial["config"],
+                                      "latency_ms": trial["latency_ms"], "time": time.time()},
+                                     ensure_ascii=False) + "\n")
+                log.flush()
+                print(f"第 {rung + 1} 轮 trial {result['trial']:3d}：{result['epochs']} 轮，"
+                      f"验证准确率 {result['val_accuracy'] * 100:.2f}%，用时 {result['train_time']:.1f} 秒", flush=True)
+
+            if rung == len(schedule) - 1:
+                break
+            # 按 Pareto 层级（同层按准确率）排序，保留前 1/eta
+            ranks = pareto_ranks(survivors)
+            survivors.sort(key=lambda trial: (ranks[trial["trial"]], -trial["val_accuracy"]))
+            keep = max(1, math.ceil(len(survivors) / args.eta))
+            for trial in survivors[keep:]:
+                trial["status"] = "pruned"
+            survivors = survivors[:keep]
+
+    for trial in survivors:
+        trial["status"] = "finished"
+    return trials
+
+
+def report(trials, slo):
+    """打印并返回准确率 / 延迟的 Pareto 前沿（按延迟从低到高）
+    只比较完成了最后一轮的配置：中途淘汰的配置训练轮数少、结构往往更小，放在一起比较会混进前沿"""
+    finished = [trial for trial in trials if trial["status"] == "finished"]
+    front = sorted(pareto_front(finished), key=lambda trial: trial["latency_ms"])
+    print(f"{'trial':>5s} {'LSTM':>10s} {'Dense':>6s} {'Dropout':>8s} {'参数量':>8s} {'轮数':>4s} "
+          f"{'验证准确率':>10s} {'延迟(ms)':>9s} {'训练(秒)':>9s}")
+    for trial in front:
+        config = trial["config"]
+        print(f"{trial['trial']:5d} {config['layers']:>4d} x {config['units']:<4d} {config['dense_units']:6d} "
+              f"{config['dropout']:8.1f} {trial['params']:8d} {trial['epochs']:4d} "
+              f"{trial['val_accuracy'] * 100:9.2f}% {trial['latency_ms']:9.2f} {trial['train_time']:9.1f}")
+    if slo:
+        within = [trial for trial in front if trial["latency_ms"] <= slo]
+        if within:
+            best = max(within, key=lambda trial: trial["val_accuracy"])
+            print(f"满足 {slo} ms 延迟 SLO 的最佳配置：trial {best['trial']} {best['config']}")
+        else:
+            print(f"没有配置满足 {slo} ms 的延迟 SLO")
+    return front
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LSTM 结构超参数搜索（并行 + successive halving + Pareto 前沿）")
+    parser.add_argument("--trials", type=int, default=27, help="抽取的配置组数")
+    parser.add_argument("--workers", type=int, default=2, help="并行训练的 worker 进程数")
+    parser.add_argument("--min-epochs", type=int, default=1, help="第一轮每组配置训练的轮数")
+    parser.add_argument("--max-epochs", type=int, default=9, help="最后一轮训练到的轮数")
+    parser.add_argument("--eta", type=int, default=3, help="每轮保留 1/eta 的配置，下一轮的轮数乘以 eta")
+    parser.add_argument("--latency-slo", type=float, help="单张推理延迟上限（毫秒），超出的配置不参与训练")
+    parser.add_argument("--batch-size", type=int, default=runtime_config.load()["batch_size"])
+    parser.add_argument("--val-size", type=int, default=5000, help="从训练集末尾留出的验证样本数")
+    parser.add_argument("--seed", type=int, default=0, help="抽取配置和打乱数据的随机种子")
+    parser.add_argument("--search-dir", default="search/lstm_mnist", help="保存模型、试验日志和结果的目录（必须不存在或为空）")
+    parser.add_argument("--data-dir", default=mnist_data.DEFAULT_DIR, help="本地 MNIST 缓存目录")
+    parser.add_argument("--mnist-source", help="缓存不存在时从该 mnist.npz 转换（离线环境使用）")
+    args = parser.parse_args()
+    if args.min_epochs < 1:
+        parser.error("--min-epochs 至少为 1")
+    if args.eta < 2:
+        parser.error("--eta 至少为 2（为 1 时每轮都不淘汰，轮数也不增长）")
+
+    mnist_data.load(args.data_dir, args.mnist_source)
+    start = time.perf_counter()
+    run_id = new_run_id()
+    trials = search(args, run_id)
+    front = report(trials, args.latency_slo)
+
+    path = os.path.join(args.search_dir, RESULTS)
+    front_ids = {trial["trial"] for trial in front}
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump([{"run_id": run_id, **trial, "pareto": trial["trial"] in front_ids} for trial in trials], f,
+                  indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+    print(f"搜索 {run_id}：共 {len(trials)} 组配置，用时 {time.perf_counter() - start:.0f} 秒；日志 {os.path.join(args.search_dir, LOG)}，"
+          f"结果 {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+# 本地 MNIST 缓存：每个数组单独保存为 .npy（uint8），加载时用 np.load(mmap_mode='r') 直接映射，不需要解压
+# 目录可通过 --data-dir 或环境变量 MNIST_DATA_DIR 指定
+DEFAULT_DIR = os.environ.get("MNIST_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "mnist"))
+ARRAYS = ["x_train", "y_train", "x_test", "y_test"]
+MANIFEST = "manifest.json"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def convert(directory=DEFAULT_DIR, source=None):
+    """把 MNIST 转换成本地 .npy 缓存
+    source: 本地的 mnist.npz（离线机器上手动拷贝）；不指定时通过 Keras 下载"""
+    if source:
+        with np.load(source) as data:
+            arrays = {name: data[name] for name in ARRAYS}
+    else:
+        from tensorflow.keras.datasets import mnist
+        (x_train, y_train), (x_test, y_test) = mnist.load_data()
+        arrays = {"x_train": x_train, "y_train": y_train, "x_test": x_test, "y_test": y_test}
+
+    os.makedirs(directory, exist_ok=True)
+    manifest = {}
+    for name in ARRAYS:
+        array = np.ascontiguousarray(arrays[name], dtype=np.uint8)
+        path = os.path.join(directory, name + ".npy")
+        # 先写临时文件再替换，写到一半中断不会留下损坏的缓存
+        temp = path + ".tmp"
+        with open(temp, "wb") as f:
+            np.save(f, array)
+        os.replace(temp, path)
+        manifest[name] = {"shape": list(array.shape), "size": os.path.getsize(path), "sha256": file_sha256(path)}
+    check_shapes(manifest)
+
+    temp = os.path.join(directory, MANIFEST + ".tmp")
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp, os.path.join(directory, MANIFEST))
+    return manifest
+
+
+def check_shapes(manifest):
+    for split in ("train", "test"):
+        images = manifest[f"x_{split}"]["shape"]
+        labels = manifest[f"y_{split}"]["shape"]
+        if len(images) != 3 or len(labels) != 1 or images[0] != labels[0]:
+            raise ValueError(f"MNIST {split} 数据形状不一致: 图像 {images}，标签 {labels}")
+
+
+def verify(directory=DEFAULT_DIR, full=False):
+    """校验缓存：文件大小、数组形状和类型；full 时还校验 SHA-256。返回清单"""
+    manifest_path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"找不到 MNIST 缓存清单 {manifest_path}，请先运行 python mnist_data.py 转换")
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    check_shapes(manifest)
+    for name in ARRAYS:
+        path = os.path.join(directory, name + ".npy")
+        expected = manifest[name]
+        if not os.path.exists(path) or os.path.getsize(path) != expected["size"]:
+            raise ValueError(f"MNIST 缓存文件 {path} 缺失或大小不符，请重新转换")
+        if full and file_sha256(path) != expected["sha256"]:
+            raise ValueError(f"MNIST 缓存文件 {path} 校验和不符，请重新转换")
+    return manifest
+
+
+def load(directory=DEFAULT_DIR, source=None, full_check=False):
+    """加载 ((x_train, y_train), (x_test, y_test))，数组为只读内存映射
+    缓存不存在时先转换（需要 source 或能联网下载）"""
+    if not os.path.exists(os.path.join(directory, MANIFEST)):
+        convert(directory, source)
+    manifest = verify(directory, full=full_check)
+
+    arrays = {}
+    for name in ARRAYS:
+        array = np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+        if array.dtype != np.uint8 or list(array.shape) != manifest[name]["shape"]:
+            raise ValueError(f"MNIST 缓存 {name} 的类型或形状不符: {array.dtype} {array.shape}")
+        arrays[name] = array
+    return (arrays["x_train"], arrays["y_train"]), (arrays["x_test"], arrays["y_test"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="转换并校验本地 MNIST 缓存")
+    parser.add_argument("--data-dir", default=DEFAULT_DIR, help="缓存目录")
+    parser.add_argument("--source", help="本地 mnist.npz 路径（离线环境使用，不指定则通过 Keras 下载）")
+    parser.add_argument("--verify", action="store_true", help="只做完整校验（含 SHA-256），不转换")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.verify:
+        verify(args.data_dir, full=True)
+        print(f"校验通过：{args.data_dir}")
+    else:
+        manifest = convert(args.data_dir, args.source)
+        for name in ARRAYS:
+            print(f"{name}: {manifest[name]['shape']}")
+        print(f"已写入 {args.data_dir}")
+    print(f"用时 {time.perf_counter() - start:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from mnist_inference import DEFAULT_MODEL, IMAGE_SHAPE, load_model, prepare
+
+
+# 导出模块：固定签名 (batch, 28, 28) uint8 → (batch, 10) 概率
+# 归一化（旧版模型没有 Rescaling 层时）也放进图里，调用方直接传原始像素
+class ExportModule(tf.Module):
+    def __init__(self, model, rescales, jit_compile=False):
+        super().__init__()
+        self.model = model
+        self.rescales = rescales
+        self.serve = tf.function(self.predict, jit_compile=jit_compile,
+                                 input_signature=[tf.TensorSpec([None, *IMAGE_SHAPE], tf.uint8, name="images")])
+
+    def predict(self, images):
+        images = tf.cast(images, tf.float32)
+        if not self.rescales:
+            images = images / 255.0
+        return self.model(images, training=False)
+
+
+def export(model_path=DEFAULT_MODEL, export_dir="lstm_mnist_savedmodel", jit_compile=False):
+    """把 h5 模型导出为 SavedModel（jit_compile=True 时推理函数用 XLA 编译）"""
+    model, rescales = load_model(model_path)
+    module = ExportModule(model, rescales, jit_compile)
+    tf.saved_model.save(module, export_dir, signatures={"serving_default": module.serve})
+    return export_dir
+
+
+def load_exported(export_dir):
+    """加载导出的 SavedModel，返回 predict_batch(uint8 图像) → 概率（numpy）"""
+    loaded = tf.saved_model.load(export_dir)  # 必须保留整个对象，否则变量会被回收
+
+    def predict_batch(images):
+        return loaded.serve(tf.convert_to_tensor(np.asarray(images, dtype=np.uint8))).numpy()
+
+    return predict_batch
+
+
+def time_calls(predict_batch, batch_size, seconds):
+    """反复调用直到超过 seconds 秒，返回 (平均延迟毫秒, 每秒张数)"""
+    images = np.random.default_rng(0).integers(0, 256, (batch_size, *IMAGE_SHAPE), dtype=np.uint8)
+    predict_batch(images)  # 预热（首次调用会追踪/编译）
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        predict_batch(images)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            break
+    return elapsed / calls * 1000, calls * batch_size / elapsed
+
+
+def benchmark(model_path, batch_sizes, seconds):
+    """对比 h5 即时执行、SavedModel、SavedModel + XLA 在不同批大小下的延迟和吞吐量"""
+    model, rescales = load_model(model_path)
+    predictors = {"h5 eager": lambda images: model(prepare(images, rescales), training=False).numpy()}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, jit_compile in (("SavedModel", False), ("SavedModel+XLA", True)):
+            path = export(model_path, os.path.join(directory, name), jit_compile)
+            predictors[name] = load_exported(path)
+
+        # 先确认三种方式结果一致
+        check = np.random.default_rng(1).integers(0, 256, (8, *IMAGE_SHAPE), dtype=np.uint8)
+        reference = predictors["h5 eager"](check)
+        for name, predict_batch in predictors.items():
+            difference = np.abs(predict_batch(check) - reference).max()
+            print(f"{name:15s} 与 h5 输出最大差异 {difference:.2e}")
+
+        print(f"{'方式':15s} {'批大小':>6s} {'延迟(ms)':>10s} {'吞吐(张/秒)':>12s}")
+        for batch_size in batch_sizes:
+            for name, predict_batch in predictors.items():
+                latency, throughput = time_calls(predict_batch, batch_size, seconds)
+                print(f"{name:15s} {batch_size:6d} {latency:10.2f} {throughput:12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导出 SavedModel（可选 XLA 编译）并测试推理性能")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="h5 模型路径")
+    parser.add_argument("--export-dir", default="lstm_mnist_savedmodel", help="SavedModel 输出目录")
+    parser.add_argument("--jit-compile", action="store_true", help="推理函数使用 XLA 编译")
+    parser.add_argument("--benchmark", action="store_true", help="不导出，改为对比各种推理方式")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--seconds", type=float, default=2.0, help="每项测试持续的秒数")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.model, args.batch_sizes, args.seconds)
+    else:
+        export(args.model, args.export_dir, args.jit_compile)
+        print(f"已导出到 {args.export_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import tensorflow as tf
+
+DEFAULT_MODEL = "lstm_mnist_model.h5"
+IMAGE_SHAPE = (28, 28)
+
+
+def load_model(path=DEFAULT_MODEL):
+    """加载模型，返回 (模型, 是否自带 Rescaling 层)
+    旧版模型（没有 Rescaling 层）需要输入 0~1 的 float32，新版模型直接接收 0~255 的像素"""
+    model = tf.keras.models.load_model(path, compile=False)
+    rescales = any(isinstance(layer, tf.keras.layers.Rescaling) for layer in model.layers)
+    return model, rescales
+
+
+def prepare(images, rescales):
+    """把一批 0~255 的图像转换成模型需要的输入"""
+    images = np.asarray(images)
+    if rescales:
+        return images.astype(np.float32, copy=False)
+    return images.astype(np.float32) / 255.0
+
+
+def load_predictor(path=DEFAULT_MODEL):
+    """返回 predict_batch(uint8 图像) → 概率
+    path 为目录时按 mnist_export.py 导出的 SavedModel 加载（图模式 / XLA），否则按 h5 模型即时执行"""
+    if os.path.isdir(path):
+        from mnist_export import load_exported
+        return load_exported(path)
+    model, rescales = load_model(path)
+    return lambda images: model(prepare(images, rescales), training=False).numpy()
+
+
+# 微批处理：收集请求直到凑满 max_batch_size 或等待超过 max_latency_ms，再统一调用一次模型
+class MicroBatcher:
+    def __init__(self, predict_batch, max_batch_size=64, max_latency_ms=5.0):
+        """predict_batch: 接收 (n, 28, 28) 的 uint8 数组，返回 (n, 10) 的概率"""
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self.worker = threading.Thread(target=self.run, name="micro-batcher", daemon=True)
+        self.worker.start()
+
+    def submit(self, image):
+        """提交一张 28x28 图像，返回 Future（结果为 10 个类别的概率）"""
+        future = Future()
+        self.requests.put((image, future))
+        return future
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.perf_counter() + self.max_latency
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            self.process(batch)
+            if stop:
+                return
+
+    def process(self, batch):
+        futures = [future for _, future in batch]
+        try:
+            probabilities = self.predict_batch(np.stack([image for image, _ in batch]))
+        except Exception as error:
+            for future in futures:
+                future.set_exception(error)
+            return
+        self.batches += 1
+        self.items += len(batch)
+        for future, row in zip(futures, probabilities):
+            future.set_result(row)
+
+    def close(self):
+        self.requests.put(None)
+        self.worker.join()
+
+
+# 推理服务：模型只加载一次并预热，所有请求经过微批处理
+class InferenceService:
+    def __init__(self, model_path=DEFAULT_MODEL, max_batch_size=64, max_latency_ms=5.0):
+        self.predict_batch = load_predictor(model_path)  # 直接对一批图像推理（不经过队列）
+        self.max_batch_size = max_batch_size
+        self.warm_up()
+        self.batcher = MicroBatcher(self.predict_batch, max_batch_size, max_latency_ms)
+
+    def warm_up(self):
+        """先用空白图像跑几次，避免第一个请求承担图构建的开销"""
+        for size in (1, self.max_batch_size):
+            self.predict_batch(np.zeros((size, *IMAGE_SHAPE), dtype=np.uint8))
+
+    def submit(self, image):
+        return self.batcher.submit(check_image(image))
+
+    def predict(self, image, timeout=None):
+        """识别一张图像，返回 (数字, 概率)"""
+        probabilities = self.submit(image).result(timeout)
+        return int(np.argmax(probabilities)), probabilities
+
+    def predict_many(self, images, timeout=None):
+        """识别多张图像（各自进入队列，可与其他请求合并成批）"""
+        futures = [self.submit(image) for image in images]
+        return [int(np.argmax(future.result(timeout))) for future in futures]
+
+    def close(self):
+        self.batcher.close()
+
+
+def check_image(image):
+    image = np.asarray(image)
+    if image.shape != IMAGE_SHAPE:
+        raise ValueError(f"图像尺寸应为 {IMAGE_SHAPE}，实际为 {image.shape}")
+    return image.astype(np.uint8, copy=False)
+
+
+# 本地 HTTP 接口
+#   POST /predict  {"image": 28x28 数组} 或 {"images": [28x28 数组, ...]}（像素 0~255）
+#                  → {"digits": [...], "probabilities": [[...], ...]}
+#   GET  /health   → {"status": "ok", "batches": ..., "items": ...}
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self.send_json(404, {"error": "not found"})
+                return
+            batcher = service.batcher
+            self.send_json(200, {"status": "ok", "batches": batcher.batches, "items": batcher.items})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self.send_json(404, {"error": "not found"})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                images = request["images"] if "images" in request else [request["image"]]
+                futures = [service.submit(image) for image in images]
+                probabilities = [future.result() for future in futures]
+            except (ValueError, KeyError, TypeError) as error:
+                self.send_json(400, {"error": str(error)})
+                return
+            self.send_json(200, {"digits": [int(np.argmax(p)) for p in probabilities],
+                                 "probabilities": [p.tolist() for p in probabilities]})
+
+        def log_message(self, format, *args):
+            pass  # 不逐条打印请求日志
+
+    return Handler
+
+
+def benchmark(service, requests, clients):
+    """用多个并发客户端线程逐张提交图像，对比逐个调用模型的吞吐量"""
+    rng = np.random.default_rng(0)
+    images = rng.integers(0, 256, (requests, *IMAGE_SHAPE), dtype=np.uint8)
+
+    start = time.perf_counter()
+    for image in images[:min(requests, 200)]:
+        service.predict_batch(image[None])
+    single = min(requests, 200) / (time.perf_counter() - start)
+
+    def client(part):
+        for image in part:
+            service.predict(image)
+
+    batches_before = service.batcher.batches
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(part,)) for part in np.array_split(images, clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    batches = service.batcher.batches - batches_before
+    print(f"逐个调用模型: {single:.0f} 张/秒")
+    print(f"微批处理（{clients} 个并发客户端）: {requests / elapsed:.0f} 张/秒，"
+          f"平均批大小 {requests / max(batches, 1):.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="手写数字识别推理服务（微批处理）")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="模型路径（h5 文件或 mnist_export.py 导出的目录）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=64, help="每批最多合并的请求数")
+    parser.add_argument("--max-latency-ms", type=float, default=5.0, help="凑批最多等待的毫秒数")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="不启动 HTTP 服务，改为用 N 张随机图像测吞吐量")
+    parser.add_argument("--clients", type=int, default=32, help="基准测试的并发客户端数")
+    args = parser.parse_args()
+
+    service = InferenceService(args.model, args.max_batch, args.max_latency_ms)
+    if args.benchmark:
+        benchmark(service, args.benchmark, args.clients)
+        service.close()
+        return
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"推理服务已启动: http://{args.host}:{args.port}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+import mnist_data
+from mnist_inference import DEFAULT_MODEL, IMAGE_SHAPE, load_model, load_predictor
+
+# 量化方式：float 不量化；dynamic 权重 int8（动态范围量化）；int8 权重和激活全部整数化
+MODES = ["float", "dynamic", "int8"]
+
+
+def unrolled(model):
+    """复制模型并把 LSTM 展开成 28 个时间步的静态计算图
+    Keras 的 LSTM 默认用 while 循环并在循环体内读取变量，TFLite 无法冻结这些变量，也无法做整数量化"""
+    def clone(layer):
+        config = layer.get_config()
+        if isinstance(layer, tf.keras.layers.LSTM):
+            config["unroll"] = True
+        return layer.__class__.from_config(config)
+
+    copy = tf.keras.models.clone_model(model, clone_function=clone)
+    copy.set_weights(model.get_weights())
+    return copy
+
+
+# 转换用模块：输入 (batch_size, 28, 28) float32 原始像素（0~255），归一化放在图内
+# 批大小必须固定：动态批大小会让 LSTM 退化成 TensorList 循环，无法转换成 TFLite 内置算子
+class ConvertModule(tf.Module):
+    def __init__(self, model, rescales, batch_size=1):
+        super().__init__()
+        self.model = model
+        self.rescales = rescales
+        self.serve = tf.function(self.predict, input_signature=[
+            tf.TensorSpec([batch_size, *IMAGE_SHAPE], tf.float32, name="images")])
+
+    def predict(self, images):
+        if not self.rescales:
+            images = images / 255.0
+        return self.model(images, training=False)
+
+
+def convert(model_path=DEFAULT_MODEL, mode="int8", representative_images=None, samples=200, batch_size=1):
+    """转换为 TFLite flatbuffer，返回字节串
+    int8 模式需要 representative_images（训练集图像，用于估计激活的取值范围）"""
+    model, rescales = load_model(model_path)
+    module = ConvertModule(unrolled(model), rescales, batch_size)
+    # 先把变量冻结成常量，否则 TFLite 里会残留 READ_VARIABLE，量化时也拿不到权重
+    frozen = convert_variables_to_constants_v2(module.serve.get_concrete_function())
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([frozen])
+    if mode in ("dynamic", "int8"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if mode == "int8":
+        rng = np.random.default_rng(0)
+        indices = rng.choice(len(representative_images), min(samples, len(representative_images)), replace=False)
+
+        def representative_dataset():
+            for index in indices:
+                yield [np.repeat(np.asarray(representative_images[index], dtype=np.float32)[None], batch_size, axis=0)]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        # 输入直接接收 uint8 像素（0~255 正好对应 scale=1 的量化），输出为 uint8 概率
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+    return converter.convert()
+
+
+# TFLite 解释器推理（支持多线程），自动处理量化输入输出
+class TFLiteClassifier:
+    def __init__(self, path, threads=None):
+        self.interpreter = tf.lite.Interpreter(model_path=path, num_threads=threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.batch_size = self.input["shape"][0]
+
+    def invoke(self, images):
+        scale, zero_point = self.input["quantization"]
+        if self.input["dtype"] == np.float32:
+            data = images.astype(np.float32)
+        else:
+            data = np.clip(np.round(images / scale + zero_point), 0, 255).astype(self.input["dtype"])
+        self.interpreter.set_tensor(self.input["index"], data)
+        self.interpreter.invoke()
+        result = self.interpreter.get_tensor(self.output["index"])
+        scale, zero_point = self.output["quantization"]
+        if self.output["dtype"] != np.float32:
+            result = (result.astype(np.float32) - zero_point) * scale
+        return result
+
+    def predict_batch(self, images):
+        """uint8 图像 (n, 28, 28) → 概率 (n, 10)
+        按转换时固定的批大小分块调用，最后一块不足时补零"""
+        images = np.asarray(images)
+        results = []
+        for start in range(0, len(images), self.batch_size):
+            chunk = images[start:start + self.batch_size]
+            if len(chunk) < self.batch_size:
+                padding = np.zeros((self.batch_size - len(chunk), *IMAGE_SHAPE), dtype=chunk.dtype)
+                results.append(self.invoke(np.concatenate([chunk, padding]))[:len(chunk)])
+            else:
+                results.append(self.invoke(chunk))
+        return np.concatenate(results)
+
+
+def evaluate(predict_batch, images, batch_size):
+    """返回 (预测的数字, 单张平均延迟毫秒)"""
+    digits = np.concatenate([np.argmax(predict_batch(images[start:start + batch_size]), axis=1)
+                             for start in range(0, len(images), batch_size)])
+
+    single = np.asarray(images[:1])
+    predict_batch(single)
+    runs = 100
+    start = time.perf_counter()
+    for _ in range(runs):
+        predict_batch(single)
+    return digits, (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="转换为 TFLite（动态范围 / int8 量化）并与浮点模型对比")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="h5 模型路径")
+    parser.add_argument("--output-dir", default="tflite", help="tflite 文件输出目录")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--data-dir", default=mnist_data.DEFAULT_DIR, help="本地 MNIST 缓存目录")
+    parser.add_argument("--mnist-source", help="缓存不存在时从该 mnist.npz 转换")
+    parser.add_argument("--representative-samples", type=int, default=200, help="int8 校准使用的训练图像数")
+    parser.add_argument("--eval-samples", type=int, default=2000, help="对比报告使用的测试图像数")
+    parser.add_argument("--threads", type=int, help="TFLite 解释器线程数（默认由 TFLite 决定）")
+    parser.add_argument("--batch-size", type=int, default=32, help="评估准确率时的批大小")
+    parser.add_argument("--tflite-batch", type=int, default=1, help="TFLite 模型固定的批大小（端侧单张推理为 1）")
+    args = parser.parse_args()
+
+    (x_train, _), (x_test, y_test) = mnist_data.load(args.data_dir, args.mnist_source)
+    x_eval = np.asarray(x_test[:args.eval_samples])
+    y_eval = np.asarray(y_test[:args.eval_samples])
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # 浮点模型（h5）作为基准；“一致率”是与浮点模型预测相同的比例，反映量化带来的偏差
+    reference, latency = evaluate(load_predictor(args.model), x_eval, args.batch_size)
+    rows = [("keras float", os.path.getsize(args.model), reference, latency)]
+
+    base = os.path.splitext(os.path.basename(args.model))[0]
+    for mode in args.modes:
+        path = os.path.join(args.output_dir, f"{base}_{mode}.tflite")
+        flatbuffer = convert(args.model, mode, x_train, args.representative_samples, args.tflite_batch)
+        with open(path, "wb") as f:
+            f.write(flatbuffer)
+        classifier = TFLiteClassifier(path, args.threads)
+        digits, latency = evaluate(classifier.predict_batch, x_eval, args.batch_size)
+        rows.append((f"tflite {mode}", os.path.getsize(path), digits, latency))
+
+    print(f"{'模型':15s} {'大小(KB)':>10s} {'准确率':>8s} {'一致率':>8s} {'单张延迟(ms)':>12s}")
+    for name, size, digits, latency in rows:
+        print(f"{name:15s} {size / 1024:10.1f} {np.mean(digits == y_eval) * 100:7.2f}% "
+              f"{np.mean(digits == reference) * 100:7.2f}% {latency:12.3f}")
+
+
+if __name__ == "__main__":
+    main()
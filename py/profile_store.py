@@ -0,0 +1,73 @@
+import json
+import os
+import sqlite3
+import threading
+
+
+# 玩家存档：成就、已解锁皮肤、当前皮肤、最高连击等保存在本地 SQLite 数据库中
+# 每个字段一行（JSON 编码），写入由后台线程批量完成，主循环只负责把最新值放进待写队列
+# SQLite 的事务保证写入过程中崩溃也不会损坏存档（要么是旧值，要么是新值）
+class ProfileStore:
+    def __init__(self, path, flush_interval=1.0):
+        """
+        path: 数据库文件路径
+        flush_interval: 后台线程批量写入的最长间隔（秒）
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.pending = {}  # 字段 -> JSON 字符串（同一字段多次保存只写最后一次）
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.closed = False
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self.connect()
+        connection.execute("CREATE TABLE IF NOT EXISTS profile (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        connection.commit()
+        self.data = {key: json.loads(value) for key, value in connection.execute("SELECT key, value FROM profile")}
+        connection.close()
+
+        self.writer = threading.Thread(target=self.write_loop, name="profile-writer", daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        connection = sqlite3.connect(self.path)
+        # WAL 模式下写入不会阻塞读取，synchronous=NORMAL 在 WAL 下仍能保证崩溃后数据库一致
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def load(self, key, default=None):
+        """读取启动时加载的存档值"""
+        return self.data.get(key, default)
+
+    def save(self, **values):
+        """保存若干字段（在调用线程中序列化，得到当前值的快照；实际写入在后台线程进行）"""
+        encoded = {key: json.dumps(value, ensure_ascii=False) for key, value in values.items()}
+        with self.lock:
+            self.pending.update(encoded)
+
+    def write_loop(self):
+        connection = self.connect()
+        while True:
+            # 每隔 flush_interval 批量写一次，关闭时立即唤醒
+            self.wakeup.wait(self.flush_interval)
+            with self.lock:
+                batch, self.pending = self.pending, {}
+                closed = self.closed
+            if batch:
+                with connection:  # 一个事务写入整批数据
+                    connection.executemany("INSERT OR REPLACE INTO profile (key, value) VALUES (?, ?)",
+                                           batch.items())
+            if closed:
+                break
+        connection.close()
+
+    def close(self):
+        """写入剩余数据并结束后台线程"""
+        with self.lock:
+            self.closed = True
+        self.wakeup.set()
+        self.writer.join()
@@ -0,0 +1,144 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+
+# 游戏循环性能分析工具
+# 只包住 Game.update / Game.draw，避免字体、图片加载等启动开销淹没真正的热点
+class GameProfiler:
+    def __init__(self, backend="cprofile", frames=None, screen=None, output_dir="profiles",
+                 sample_interval=0.001):
+        """
+        backend: "cprofile" 或 "sample"（低开销采样）
+        frames: 每次分析的帧数，None 表示一直分析到离开指定界面
+        screen: 只在该界面（如 "game"）下分析，None 表示任意界面
+        """
+        if backend not in ("cprofile", "sample"):
+            raise ValueError(f"未知的分析后端: {backend}")
+        if frames is None and screen is None:
+            raise ValueError("frames 和 screen 至少需要指定一个")
+        self.backend = backend
+        self.frames = frames
+        self.screen = screen
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+
+        self.active = False
+        self.finished = False
+        self.frame_count = 0
+        self.run_index = 0
+        self.dumped_files = []
+
+        self._profile = None
+        self._stacks = Counter()
+        self._sampling = False
+        self._sampler = None
+        self._target_thread = None
+
+    def run_frame(self, game, surface):
+        """执行一帧 update + draw，满足条件时对其进行分析"""
+        if self.finished or not self._wanted(game.current_screen):
+            if self.active:
+                # 离开了目标界面，结束本次分析
+                self._stop()
+            game.update()
+            game.draw(surface)
+            return
+
+        if not self.active:
+            self._start()
+
+        if self.backend == "cprofile":
+            self._profile.enable()
+            try:
+                game.update()
+                game.draw(surface)
+            finally:
+                self._profile.disable()
+        else:
+            self._sampling = True
+            try:
+                game.update()
+                game.draw(surface)
+            finally:
+                self._sampling = False
+
+        self.frame_count += 1
+        if self.frames is not None and self.frame_count >= self.frames:
+            self._stop()
+            self.finished = True
+
+    def close(self):
+        """退出游戏前调用，保存尚未写出的结果"""
+        if self.active:
+            self._stop()
+
+    def _wanted(self, current_screen):
+        return self.screen is None or current_screen == self.screen
+
+    def _start(self):
+        self.active = True
+        self.frame_count = 0
+        self.run_index += 1
+        if self.backend == "cprofile":
+            self._profile = cProfile.Profile()
+        else:
+            self._stacks = Counter()
+            self._target_thread = threading.get_ident()
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+
+    def _stop(self):
+        self.active = False
+        if self.backend == "sample":
+            self._sampler.join()
+            self._sampler = None
+        self._dump()
+
+    def _sample_loop(self):
+        """采样线程：定期抓取主线程调用栈"""
+        while self.active:
+            if self._sampling:
+                frame = sys._current_frames().get(self._target_thread)
+                if frame is not None:
+                    self._stacks[self._collapse(frame)] += 1
+            time.sleep(self.sample_interval)
+
+    @staticmethod
+    def _collapse(frame):
+        """把调用栈转换为 flamegraph 使用的折叠格式（根在前）"""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+    def _dump(self):
+        """将本次分析结果写入 output_dir"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        tag = f"{self.screen or 'all'}_{time.strftime('%Y%m%d_%H%M%S')}_{self.run_index}"
+
+        if self.backend == "cprofile":
+            stats_path = os.path.join(self.output_dir, f"{tag}.prof")
+            self._profile.dump_stats(stats_path)
+            text_path = os.path.join(self.output_dir, f"{tag}.txt")
+            with open(text_path, "w", encoding="utf-8") as f:
+                f.write(f"帧数: {self.frame_count}\n")
+                stats = pstats.Stats(self._profile, stream=f)
+                stats.sort_stats("cumulative").print_stats(40)
+            self.dumped_files.extend([stats_path, text_path])
+            self._profile = None
+        else:
+            collapsed_path = os.path.join(self.output_dir, f"{tag}.collapsed")
+            with open(collapsed_path, "w", encoding="utf-8") as f:
+                for stack, count in self._stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            self.dumped_files.append(collapsed_path)
+
+        print(f"性能分析结果已保存: {self.dumped_files[-1]}（{self.frame_count} 帧）")
@@ -0,0 +1,71 @@
+from collections import deque
+
+
+# 画质等级（从高到低）
+# particle_scale: 切水果时粒子数量倍率
+# max_particles: 场上粒子总数上限
+# particle_size: 粒子尺寸倍率
+# glow: 是否绘制组合技发光底板
+# weather_blend: 是否绘制天气切换的淡入过渡
+# freeze_overlay: 是否绘制全屏冻结蒙层
+# trail_points: 刀光拖尾绘制的点数
+QUALITY_LEVELS = [
+    {"particle_scale": 1.0, "max_particles": 400, "particle_size": 1.0, "glow": True,
+     "weather_blend": True, "freeze_overlay": True, "trail_points": 16},
+    {"particle_scale": 0.6, "max_particles": 200, "particle_size": 0.8, "glow": True,
+     "weather_blend": True, "freeze_overlay": True, "trail_points": 12},
+    {"particle_scale": 0.4, "max_particles": 120, "particle_size": 0.7, "glow": False,
+     "weather_blend": True, "freeze_overlay": True, "trail_points": 10},
+    {"particle_scale": 0.25, "max_particles": 60, "particle_size": 0.6, "glow": False,
+     "weather_blend": False, "freeze_overlay": True, "trail_points": 6},
+    {"particle_scale": 0.0, "max_particles": 0, "particle_size": 0.5, "glow": False,
+     "weather_blend": False, "freeze_overlay": False, "trail_points": 2},
+]
+
+
+# 自适应画质控制器：根据最近的帧耗时逐级降低或恢复画质
+class QualityController:
+    def __init__(self, frame_budget_ms, window=30, downgrade_ratio=1.0, upgrade_ratio=0.7, cooldown=60):
+        """
+        frame_budget_ms: 目标帧耗时（毫秒），如 60FPS 对应 16.7
+        window: 统计最近多少帧的平均耗时
+        downgrade_ratio: 平均耗时超过 预算*该比例 时降低画质
+        upgrade_ratio: 平均耗时低于 预算*该比例 时恢复画质
+        cooldown: 两次调整之间至少间隔的帧数，避免来回抖动
+        """
+        self.frame_budget_ms = frame_budget_ms
+        self.window = window
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.cooldown = cooldown
+
+        self.level = 0
+        self.settings = QUALITY_LEVELS[0]
+        self.frame_times = deque(maxlen=window)
+        self.total_time = 0.0
+        self.frames_since_change = 0
+
+    def record(self, frame_ms):
+        """记录一帧的耗时，必要时调整画质等级"""
+        if len(self.frame_times) == self.window:
+            self.total_time -= self.frame_times[0]
+        self.frame_times.append(frame_ms)
+        self.total_time += frame_ms
+        self.frames_since_change += 1
+
+        if len(self.frame_times) < self.window or self.frames_since_change < self.cooldown:
+            return
+
+        average = self.total_time / self.window
+        if average > self.frame_budget_ms * self.downgrade_ratio and self.level < len(QUALITY_LEVELS) - 1:
+            self.set_level(self.level + 1)
+        elif average < self.frame_budget_ms * self.upgrade_ratio and self.level > 0:
+            self.set_level(self.level - 1)
+
+    def set_level(self, level):
+        """切换到指定画质等级"""
+        self.level = level
+        self.settings = QUALITY_LEVELS[level]
+        self.frame_times.clear()
+        self.total_time = 0.0
+        self.frames_since_change = 0
@@ -0,0 +1,117 @@
+import pygame
+
+
+# 渲染队列：收集本帧要绘制的 (图像, 左上角坐标)，最后用一次 Surface.blits 提交
+# 物体的半宽/半高预先缓存，不需要每次调用 get_rect(center=...)
+class RenderQueue:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.items = []
+
+    def add(self, image, x, y, half_w, half_h):
+        """以 (x, y) 为中心绘制 image，完全在屏幕外的直接跳过"""
+        left = int(x) - half_w
+        top = int(y) - half_h
+        if left >= self.width or top >= self.height or left + 2 * half_w <= 0 or top + 2 * half_h <= 0:
+            return
+        self.items.append((image, (left, top)))
+
+    def clear(self):
+        self.items.clear()
+
+    def extend(self, items):
+        """直接加入一批 (图像, 左上角坐标)，用于粒子等大量小图像（不做裁剪判断，由 blits 裁剪）"""
+        self.items.extend(items)
+
+    def flush(self, surface):
+        if self.items:
+            surface.blits(self.items, doreturn=False)
+            self.items.clear()
+
+
+_particle_sprites = {}
+
+
+def particle_sprite(color, size):
+    """半径为 size 的圆形粒子图像（按颜色和尺寸缓存）
+    使用色键 + RLE 加速而不是逐像素透明度，blit 比 pygame.draw.circle 更快"""
+    key = (color, size)
+    sprite = _particle_sprites.get(key)
+    if sprite is None:
+        colorkey = (0, 0, 0) if color != (0, 0, 0) else (255, 255, 255)
+        sprite = pygame.Surface((size * 2 + 1, size * 2 + 1))
+        sprite.fill(colorkey)
+        pygame.draw.circle(sprite, color, (size, size), size)
+        sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+        _particle_sprites[key] = sprite
+    return sprite
+
+
+# 图层：每帧调用 draw(surface) 重新绘制
+class Layer:
+    def __init__(self, name, draw):
+        self.name = name
+        self.draw_fn = draw
+        self.visible = True
+
+    def invalidate(self):
+        pass
+
+    def draw(self, surface):
+        self.draw_fn(surface)
+
+
+_STALE = object()
+
+
+# 缓存图层：内容只取决于 key()，key 不变时直接重用上次渲染的 (图像, 位置) 列表
+class CachedLayer:
+    def __init__(self, name, render, key=lambda: None):
+        """
+        render: 返回 [(图像, 位置), ...] 的函数，只在 key 变化或失效后调用
+        key: 返回决定图层内容的值（如分数、生命值）
+        """
+        self.name = name
+        self.render = render
+        self.key_fn = key
+        self.key = _STALE
+        self.items = []
+        self.visible = True
+
+    def invalidate(self):
+        self.key = _STALE
+
+    def draw(self, surface):
+        key = self.key_fn()
+        if key != self.key:
+            self.items = self.render()
+            self.key = key
+        if self.items:
+            surface.blits(self.items, doreturn=False)
+
+
+# 合成器：按顺序绘制各图层，隐藏的图层直接跳过
+class Compositor:
+    def __init__(self, layers=()):
+        self.layers = []
+        self.by_name = {}
+        for layer in layers:
+            self.add(layer)
+
+    def add(self, layer):
+        self.layers.append(layer)
+        self.by_name[layer.name] = layer
+
+    def invalidate(self, name=None):
+        """让某个图层（默认全部）在下次绘制时重新渲染"""
+        for layer in ([self.by_name[name]] if name else self.layers):
+            layer.invalidate()
+
+    def set_visible(self, name, visible):
+        self.by_name[name].visible = visible
+
+    def draw(self, surface):
+        for layer in self.layers:
+            if layer.visible:
+                layer.draw(surface)
@@ -0,0 +1,151 @@
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+import mnist_data
+
+# CPU 运行参数：intra-op / inter-op 线程数、oneDNN 开关、批大小
+# 优先级：命令行 > 环境变量 > 配置文件（由 --tune 自动调优写出）> 默认值
+# 线程数为 0 表示由 TensorFlow 自己决定；onednn 为 None 表示使用 TensorFlow 的默认设置
+DEFAULT_PATH = os.environ.get("MNIST_RUNTIME_CONFIG", "runtime_config.json")
+DEFAULTS = {"intra_op_threads": 0, "inter_op_threads": 0, "onednn": None, "batch_size": 64}
+ENV = {
+    "intra_op_threads": "MNIST_INTRA_OP_THREADS",
+    "inter_op_threads": "MNIST_INTER_OP_THREADS",
+    "batch_size": "MNIST_BATCH_SIZE",
+}
+ONEDNN_ENV = "TF_ENABLE_ONEDNN_OPTS"
+
+
+def load(path=DEFAULT_PATH):
+    """读取配置文件（不存在则用默认值），再用环境变量覆盖"""
+    config = dict(DEFAULTS)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        config.update({key: saved[key] for key in DEFAULTS if key in saved})
+    for key, name in ENV.items():
+        if os.environ.get(name):
+            config[key] = int(os.environ[name])
+    if os.environ.get(ONEDNN_ENV):
+        config["onednn"] = os.environ[ONEDNN_ENV].lower() not in ("0", "false")
+    return config
+
+
+def path_from_argv(argv=None):
+    """在解析完整命令行之前先取出 --runtime-config 的值（oneDNN 开关要在导入 TensorFlow 之前按它设置）"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--runtime-config", default=DEFAULT_PATH)
+    return parser.parse_known_args(argv)[0].runtime_config
+
+
+def save(config, path=DEFAULT_PATH):
+    temp = path + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump({key: config[key] for key in DEFAULTS}, f, indent=2)
+    os.replace(temp, path)
+
+
+def apply_onednn(config):
+    """设置 oneDNN 开关，必须在导入 tensorflow 之前调用（TensorFlow 只在导入时读取一次）"""
+    if config["onednn"] is not None:
+        os.environ[ONEDNN_ENV] = "1" if config["onednn"] else "0"
+
+
+def apply_threads(config):
+    """设置线程池大小，必须在 TensorFlow 执行第一个运算之前调用"""
+    import tensorflow as tf
+
+    if config["intra_op_threads"]:
+        tf.config.threading.set_intra_op_parallelism_threads(config["intra_op_threads"])
+    if config["inter_op_threads"]:
+        tf.config.threading.set_inter_op_parallelism_threads(config["inter_op_threads"])
+
+
+def describe(config):
+    onednn = {None: "默认", True: "开", False: "关"}[config["onednn"]]
+    return (f"intra-op {config['intra_op_threads'] or '自动'}，inter-op {config['inter_op_threads'] or '自动'}，"
+            f"oneDNN {onednn}，批大小 {config['batch_size']}")
+
+
+def run_trial(config, data_dir, steps, warmup):
+    """在当前进程中训练 warmup + steps 步，返回每秒训练的图像数（调用前不能导入过 tensorflow）"""
+    apply_onednn(config)
+    apply_threads(config)
+    from lstm_mnist import build_model, load_data, make_dataset
+
+    (x_train, y_train), _ = load_data(data_dir)
+    model = build_model(x_train.shape[1:])
+    dataset = make_dataset(x_train, y_train, config["batch_size"], shuffle=True, seed=0).repeat()
+    model.fit(dataset, steps_per_epoch=warmup, epochs=1, verbose=0)  # 预热：图构建、线程池和内存分配
+    start = time.perf_counter()
+    model.fit(dataset, steps_per_epoch=steps, epochs=1, verbose=0)
+    return steps * config["batch_size"] / (time.perf_counter() - start)
+
+
+def tune(grid, data_dir, steps, warmup):
+    """逐个组合在独立子进程中试跑（线程数和 oneDNN 在进程内只能设置一次），返回按吞吐量排序的结果
+    只比较训练速度：批大小会影响收敛，最终选择前可以再确认一下准确率"""
+    results = []
+    for values in itertools.product(*grid.values()):
+        config = dict(zip(grid, values))
+        command = [sys.executable, os.path.abspath(__file__), "--trial", json.dumps(config),
+                   "--data-dir", data_dir, "--steps", str(steps), "--warmup", str(warmup)]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{describe(config)}：失败\n{completed.stderr[-500:]}")
+            continue
+        throughput = json.loads(completed.stdout.strip().splitlines()[-1])["images_per_sec"]
+        print(f"{describe(config)}：{throughput:.0f} 张/秒", flush=True)
+        results.append((throughput, config))
+    results.sort(key=lambda result: result[0], reverse=True)
+    return results
+
+
+def thread_counts():
+    """1, 2, 4, ... 直到 CPU 核数（包括核数本身）"""
+    cores = os.cpu_count() or 1
+    counts = [1 << i for i in range(cores.bit_length()) if 1 << i < cores]
+    return counts + [cores]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU 训练参数（线程数 / oneDNN / 批大小）的自动调优")
+    parser.add_argument("--output", default=DEFAULT_PATH, help="写出最快配置的文件（lstm_mnist.py 默认读取）")
+    parser.add_argument("--intra-op-threads", type=int, nargs="+", default=thread_counts())
+    parser.add_argument("--inter-op-threads", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--onednn", choices=["on", "off"], nargs="+", default=["on", "off"])
+    parser.add_argument("--steps", type=int, default=30, help="每个组合计时的训练步数")
+    parser.add_argument("--warmup", type=int, default=5, help="计时前预热的步数")
+    parser.add_argument("--data-dir", default=mnist_data.DEFAULT_DIR, help="本地 MNIST 缓存目录")
+    parser.add_argument("--mnist-source", help="缓存不存在时从该 mnist.npz 转换（离线环境使用）")
+    parser.add_argument("--trial", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.trial:
+        throughput = run_trial(json.loads(args.trial), args.data_dir, args.steps, args.warmup)
+        print(json.dumps({"images_per_sec": throughput}))
+        return
+
+    mnist_data.load(args.data_dir, args.mnist_source)
+    grid = {
+        "intra_op_threads": args.intra_op_threads,
+        "inter_op_threads": args.inter_op_threads,
+        "onednn": [value == "on" for value in args.onednn],
+        "batch_size": args.batch_sizes,
+    }
+    results = tune(grid, args.data_dir, args.steps, args.warmup)
+    if not results:
+        raise SystemExit("所有组合都失败了")
+    throughput, best = results[0]
+    save(best, args.output)
+    print(f"最快配置：{describe(best)}（{throughput:.0f} 张/秒），已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
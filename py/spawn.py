@@ -0,0 +1,140 @@
+import argparse
+import heapq
+import random
+from collections import namedtuple
+
+# 各难度的生成参数
+DIFFICULTY_SETTINGS = {
+    "easy": {"speed_factor": 0.8, "spawn_delay": 70, "bomb_chance": 0.1},
+    "medium": {"speed_factor": 1.0, "spawn_delay": 50, "bomb_chance": 0.15},
+    "hard": {"speed_factor": 1.2, "spawn_delay": 35, "bomb_chance": 0.25},
+}
+FRUIT_TYPES = ["apple", "banana", "watermelon", "pear", "strawberry"]
+MIN_SPAWN_DELAY = 15  # 难度上限（最短生成间隔，帧数）
+FRUIT_SPEED_STEP = 0.05  # 每升一级水果速度增加量
+LEVEL_UP_SPAWNS = 5  # 每5个生成周期升一级
+POWERUP_CHANCE = 0.05  # 每个生成周期额外生成道具的概率
+BASE_VERTICAL_SPEED = -10  # 基础垂直速度（负值表示向上）
+BASE_HORIZONTAL_SPEED = 2  # 基础水平速度
+SPAWN_RADIUS = 30
+
+# 一次生成：在第 tick 帧生成 kind（fruit / bomb / powerup）
+SpawnEvent = namedtuple("SpawnEvent", ["tick", "kind", "fruit_type", "x", "speed_x", "speed_y", "level"])
+
+
+# 生成调度器：按难度曲线提前批量生成未来的生成事件，放入按帧号排序的堆中
+class SpawnScheduler:
+    def __init__(self, difficulty, width, height, fruit_types=FRUIT_TYPES, seed=None, batch_size=20,
+                 start_tick=0, overrides=None):
+        """overrides: 可选，覆盖难度参数（speed_factor / spawn_delay / bomb_chance / speed_step），用于调参"""
+        settings = dict(DIFFICULTY_SETTINGS[difficulty], speed_step=FRUIT_SPEED_STEP)
+        settings.update(overrides or {})
+        self.width = width
+        self.height = height
+        self.fruit_types = fruit_types
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+
+        self.speed_factor = settings["speed_factor"]
+        self.bomb_chance = settings["bomb_chance"]
+        self.spawn_delay = settings["spawn_delay"]
+        self.speed_step = settings["speed_step"]
+        self.fruit_speed = 1.0
+        self.level = 1
+        self.spawn_count = 0
+        self.next_tick = start_tick + self.spawn_delay
+
+        self.queue = []
+        self.sequence = 0  # 同一帧内保持生成顺序
+        self.fill(batch_size)
+
+    def fill(self, waves):
+        """向队列追加 waves 个生成周期"""
+        for _ in range(waves):
+            self.generate_wave()
+
+    def generate_wave(self):
+        """生成一个周期的事件（水果或炸弹，外加可能的道具）"""
+        tick = self.next_tick
+        self.spawn_count += 1
+
+        # 每5个生成周期增加一个难度级别
+        if self.spawn_count % LEVEL_UP_SPAWNS == 0:
+            self.level += 1
+            if self.spawn_delay > MIN_SPAWN_DELAY:
+                self.spawn_delay -= 2
+            self.fruit_speed += self.speed_step
+
+        if self.rng.random() > self.bomb_chance:
+            self.push(self.make_event(tick, "fruit", self.rng.choice(self.fruit_types)))
+        else:
+            self.push(self.make_event(tick, "bomb", None))
+
+        if self.rng.random() < POWERUP_CHANCE:
+            self.push(self.make_event(tick, "powerup", None))
+
+        self.next_tick = tick + self.spawn_delay
+
+    def make_event(self, tick, kind, fruit_type):
+        speed = self.speed_factor * self.fruit_speed
+        x = self.rng.randint(SPAWN_RADIUS, self.width - SPAWN_RADIUS)
+        speed_x = self.rng.uniform(-BASE_HORIZONTAL_SPEED, BASE_HORIZONTAL_SPEED) * speed
+        speed_y = BASE_VERTICAL_SPEED * speed
+        return SpawnEvent(tick, kind, fruit_type, x, speed_x, speed_y, self.level)
+
+    def push(self, event):
+        heapq.heappush(self.queue, (event.tick, self.sequence, event))
+        self.sequence += 1
+
+    def pop_due(self, tick):
+        """取出所有到期（<= tick）的生成事件"""
+        # 队列不足一半时补充下一批
+        if len(self.queue) < self.batch_size // 2:
+            self.fill(self.batch_size)
+
+        due = []
+        queue = self.queue
+        while queue and queue[0][0] <= tick:
+            due.append(heapq.heappop(queue)[2])
+        return due
+
+    def upcoming(self, count=None):
+        """按时间顺序返回尚未生成的事件（用于查看和离线调参）"""
+        events = [item[2] for item in sorted(self.queue)]
+        return events if count is None else events[:count]
+
+
+# 对象池：复用水果/炸弹/道具对象，避免每次生成都重新加载图像
+class ObjectPool:
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+
+    def acquire(self):
+        return self.free.pop() if self.free else self.factory()
+
+    def release(self, obj):
+        self.free.append(obj)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线查看生成计划")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTY_SETTINGS), default="medium")
+    parser.add_argument("--ticks", type=int, default=3600, help="查看前多少帧（60帧=1秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scheduler = SpawnScheduler(args.difficulty, 800, 600, seed=args.seed)
+    counts = {"fruit": 0, "bomb": 0, "powerup": 0}
+    level = 1
+    for tick in range(args.ticks + 1):
+        for event in scheduler.pop_due(tick):
+            counts[event.kind] += 1
+            level = event.level
+            print(f"{event.tick:6d}  {event.kind:8s} {event.fruit_type or '':11s} x={event.x:4d} "
+                  f"vx={event.speed_x:6.2f} vy={event.speed_y:6.2f} level={event.level}")
+    print(f"共 {args.ticks} 帧: {counts}，最终等级 {level}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 模块都放在 py/ 下按文件名导入；游戏相关的测试在无界面环境中运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
@@ -0,0 +1,20 @@
+import balance
+
+PLAYER = {"hit_rate": 0.9, "reaction_ticks": 12, "bomb_avoid": 0.98}
+
+
+def run(seeds, difficulty="hard", max_ticks=18000):
+    balance.init_worker()  # 相当于一个新的工作进程
+    return [balance.run_session((difficulty, seed, PLAYER, {}, max_ticks)) for seed in seeds]
+
+
+def test_same_seed_same_result_regardless_of_previous_sessions():
+    # 工作进程会复用同一个 Game：同一个种子先跑过其他局和直接跑，结果必须一致（与 --workers 无关）
+    fresh = run([4])[0]
+    reused = run([0, 1, 2, 3, 4])[-1]
+    assert reused == fresh
+
+
+def test_percentile():
+    assert balance.percentile([5, 1, 3, 2, 4], 0.0) == 1
+    assert balance.percentile([5, 1, 3, 2, 4], 0.9) == 5
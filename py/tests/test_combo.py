@@ -0,0 +1,52 @@
+from combo import ComboTracker
+
+
+def test_slices_expire_after_window():
+    tracker = ComboTracker(window=10)
+    tracker.add("fire", 0)
+    tracker.add("fire", 5)
+    tracker.evict(9)
+    assert len(tracker) == 2
+    # 第 0 帧的切片在第 10 帧过期，第 5 帧的在第 15 帧过期
+    tracker.evict(10)
+    assert len(tracker) == 1 and tracker.count("fire") == 1
+    tracker.evict(15)
+    assert len(tracker) == 0 and not tracker.has("fire")
+
+
+def test_type_windows_override_default():
+    tracker = ComboTracker(window=10, type_windows={"freeze": 30})
+    tracker.add("fire", 0)
+    tracker.add("freeze", 0)
+    tracker.evict(20)
+    assert not tracker.has("fire")
+    assert tracker.has("freeze")
+    tracker.evict(30)
+    assert len(tracker) == 0
+
+
+def test_distinct_counts_types_with_live_slices():
+    tracker = ComboTracker(window=10)
+    tracker.add("fire", 0)
+    tracker.add("fire", 1)
+    tracker.add("explosion", 5)
+    assert tracker.distinct == 2
+    tracker.evict(11)
+    assert tracker.distinct == 1
+    # 同一类型过期后再次出现，重新计入
+    tracker.add("fire", 12)
+    assert tracker.distinct == 2
+    tracker.evict(100)
+    assert tracker.distinct == 0
+
+
+def test_best_streak_survives_eviction_until_clear():
+    tracker = ComboTracker(window=10)
+    for tick in range(4):
+        tracker.add("fire", tick)
+    tracker.evict(50)
+    tracker.add("fire", 50)
+    assert len(tracker) == 1
+    assert tracker.best_streak == 4
+    tracker.clear()
+    assert tracker.best_streak == 0 and tracker.distinct == 0 and len(tracker) == 0
@@ -0,0 +1,125 @@
+from achievements import COMBO_MASTER_STREAK, AchievementTracker, SessionStats
+from events import BombEvent, ComboEvent, EventBus, GameOverEvent, SliceEvent, WeatherEvent
+
+
+class FakeGame:
+    def __init__(self):
+        self.achievements = {}
+        self.unlocked_skins = {}
+        self.highest_combo = 0
+        self.best_combo = 0
+        self.saves = 0
+
+    def save_profile(self):
+        self.saves += 1
+
+    def unlock_skin(self, fruit, skin):
+        self.unlocked_skins.setdefault(fruit, []).append(skin)
+
+
+def test_dispatch_groups_events_by_type_once_per_frame():
+    bus = EventBus()
+    batches = []
+    bus.subscribe(SliceEvent, lambda events: batches.append(("slice", events)))
+    bus.subscribe(BombEvent, lambda events: batches.append(("bomb", events)))
+    slices = [SliceEvent(1, "apple", "fire", 10), SliceEvent(1, "pear", "freeze", 20)]
+    bus.emit(slices[0])
+    bus.emit(BombEvent(1))
+    bus.emit(slices[1])
+    bus.emit(ComboEvent(1, 2, "x"))  # 没有订阅者的事件直接丢弃
+    assert batches == []
+    bus.dispatch()
+    assert batches == [("slice", slices), ("bomb", [BombEvent(1)])]
+    bus.dispatch()
+    assert len(batches) == 2
+
+
+def test_events_emitted_by_handlers_wait_for_next_dispatch():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(BombEvent, lambda events: bus.emit(GameOverEvent(events[0].tick, "bomb", 0, 1, "easy")))
+    bus.subscribe(GameOverEvent, seen.extend)
+    bus.emit(BombEvent(5))
+    bus.dispatch()
+    assert seen == []
+    bus.dispatch()
+    assert [event.cause for event in seen] == ["bomb"]
+
+
+def test_clear_drops_pending_events():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(BombEvent, seen.extend)
+    bus.emit(BombEvent(1))
+    bus.clear()
+    bus.dispatch()
+    assert seen == []
+
+
+def test_achievements_unlock_once_and_save_only_on_change():
+    game, bus = FakeGame(), EventBus()
+    AchievementTracker(game, bus)
+    bus.emit(SliceEvent(1, "apple", None, 40))
+    bus.emit(SliceEvent(1, "apple", None, 120))
+    bus.dispatch()
+    assert game.achievements == {"first_slice": True, "100_score": True}
+    assert game.unlocked_skins == {"watermelon": ["frost"]}
+    assert game.saves == 1
+
+    bus.emit(SliceEvent(2, "pear", None, 200))
+    bus.dispatch()
+    assert game.saves == 1
+
+    bus.emit(GameOverEvent(3, "lives", 200, 4, "medium"))
+    bus.dispatch()
+    assert "hard_mode" not in game.achievements
+    bus.emit(GameOverEvent(4, "bomb", 10, 1, "hard"))
+    bus.dispatch()
+    assert game.achievements["hard_mode"] and game.saves == 2
+
+
+def test_combo_record_and_combo_master():
+    game, bus = FakeGame(), EventBus()
+    AchievementTracker(game, bus)
+    bus.emit(ComboEvent(1, 2, "x"))
+    bus.emit(ComboEvent(1, 3, "x"))
+    bus.dispatch()
+    assert (game.highest_combo, game.best_combo, game.saves) == (3, 3, 1)
+    assert "combo_master" not in game.achievements
+
+    # 新的一局：本局最高连击清零，历史记录保留
+    game.highest_combo = 0
+    bus.emit(ComboEvent(2, 2, "x"))
+    bus.dispatch()
+    assert (game.highest_combo, game.best_combo, game.saves) == (2, 3, 1)
+
+    bus.emit(ComboEvent(3, COMBO_MASTER_STREAK, "x"))
+    bus.dispatch()
+    assert game.achievements["combo_master"] and game.best_combo == COMBO_MASTER_STREAK
+
+
+def test_all_weather_needs_every_state():
+    game, bus = FakeGame(), EventBus()
+    AchievementTracker(game, bus)
+    bus.emit(WeatherEvent(1, "sunny", "rainy"))
+    bus.dispatch()
+    assert "all_weather" not in game.achievements
+    bus.emit(WeatherEvent(2, "rainy", "sunny"))
+    bus.dispatch()
+    assert game.saves == 1  # 没有新天气，不保存
+    bus.emit(WeatherEvent(3, "sunny", "snowy"))
+    bus.dispatch()
+    assert game.achievements["all_weather"]
+    assert sorted(game.achievements["weather_history"]) == ["rainy", "snowy", "sunny"]
+
+
+def test_session_stats_count_and_reset():
+    bus = EventBus()
+    stats = SessionStats(bus)
+    for event in (SliceEvent(1, "apple", None, 1), SliceEvent(1, "apple", None, 2), SliceEvent(2, "pear", None, 3),
+                  BombEvent(2), ComboEvent(2, 2, "x")):
+        bus.emit(event)
+    bus.dispatch()
+    assert (stats.slices, stats.bombs, stats.combos) == ({"apple": 2, "pear": 1}, 1, 1)
+    stats.reset()
+    assert (stats.slices, stats.bombs, stats.combos) == ({}, 0, 0)
@@ -0,0 +1,105 @@
+import pytest
+
+import bisect
+import random
+
+from leaderboard import INDEXES, Leaderboard, LeaderboardWriter, ScoreCounts
+
+WEEK = "2024-W07"
+
+
+@pytest.fixture
+def board(tmp_path):
+    board = Leaderboard(str(tmp_path / "leaderboard.db"), top_k=3, device="pc")
+    yield board
+    board.close()
+
+
+def indexes(board):
+    return {row[0] for row in board.connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_submit_returns_weekly_rank_with_ties(board):
+    assert board.submit("easy", 50, week=WEEK) == 1
+    assert board.submit("easy", 80, week=WEEK) == 1
+    assert board.submit("easy", 50, week=WEEK) == 2  # 同分并列
+    assert board.submit("easy", 10, week=WEEK) == 4
+    assert board.submit("easy", 99, week="2024-W08") == 1  # 其他周不影响
+    assert board.rank("easy", 60, week=WEEK) == 2
+    assert board.count("easy", week=WEEK) == 4
+    assert board.count("easy") == 5
+    assert board.count("hard") == 0
+
+
+def test_caches_stay_consistent_with_database(board):
+    for score in (5, 40, 20):
+        board.submit("medium", score, week=WEEK, device="phone")
+    # 先加载缓存，再提交新成绩，缓存要增量更新
+    assert [entry.score for entry in board.top("medium")] == [40, 20, 5]
+    assert board.rank("medium", 30, device="phone") == 2
+    board.submit("medium", 30, week=WEEK)
+    board.submit("medium", 1, week=WEEK)
+    assert [entry.score for entry in board.top("medium")] == [40, 30, 20]
+    assert board.rank("medium", 30) == 2
+    assert board.rank("medium", 30, device="phone") == 2  # 另一台设备的成绩不计入
+    assert board.top("medium", device="pc")[0].score == 30
+
+
+def test_score_counts_match_sorted_list():
+    rng = random.Random(0)
+    counts, scores = ScoreCounts(), []
+    for _ in range(2000):
+        score = rng.choice([rng.randint(0, 30), rng.randint(0, 50000)])  # 高分会触发扩容
+        counts.add(score)
+        bisect.insort(scores, score)
+        query = rng.randint(-3, 60000)
+        assert counts.count_at_most(query) == bisect.bisect_right(scores, query)
+    assert len(counts) == 2000
+    with pytest.raises(ValueError):
+        counts.add(-1)
+
+
+def test_writer_submits_in_background(tmp_path):
+    path = str(tmp_path / "leaderboard.db")
+    writer = LeaderboardWriter(path, device="pc")
+    results = [writer.submit("easy", score, combo=3, level=2) for score in (10, 30, 20)]
+    assert [result.result(timeout=10) for result in results] == [(1, 1), (1, 2), (2, 3)]
+    writer.close()
+
+    board = Leaderboard(path)
+    assert [(entry.score, entry.combo, entry.device) for entry in board.top("easy")] == \
+        [(30, 3, "pc"), (20, 3, "pc"), (10, 3, "pc")]
+    board.close()
+
+
+def test_page_and_page_of(board):
+    for score in range(10):
+        board.submit("hard", score, week=WEEK)
+    assert [entry.score for entry in board.page("hard", 1, page_size=4)] == [5, 4, 3, 2]
+    assert board.page_of("hard", 5, page_size=4) == 1
+
+
+def test_csv_round_trip(board, tmp_path):
+    for score in (3, 7):
+        board.submit("easy", score, week=WEEK, combo=score, level=2)
+    path = str(tmp_path / "scores.csv")
+    assert board.export_csv(path) == 2
+
+    board.top("easy")  # 导入后缓存要失效
+    assert board.import_csv(path, batch_size=1) == 2
+    assert board.count("easy", week=WEEK) == 4
+    assert [entry.score for entry in board.top("easy")] == [7, 7, 3]
+    assert indexes(board) >= set(INDEXES)
+
+
+def test_failed_import_rolls_back_and_keeps_indexes(board, tmp_path):
+    board.submit("easy", 10, week=WEEK)
+    path = tmp_path / "bad.csv"
+    path.write_text("difficulty,week,device,score,combo,level,created\n"
+                    "easy,2024-W07,pc,20,0,1,1\n"
+                    "easy,2024-W07,pc,not-a-number,0,1,1\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        board.import_csv(str(path), batch_size=1)
+    assert board.count("easy") == 1
+    assert board.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0] == 1
+    assert indexes(board) >= set(INDEXES)
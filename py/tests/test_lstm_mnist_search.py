@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pytest
+
+from lstm_mnist_search import (SEARCH_SPACE, epoch_schedule, pareto_front, pareto_ranks, report, sample_configs,
+                               search)
+
+
+def trial(id, accuracy, latency):
+    return {"trial": id, "val_accuracy": accuracy, "latency_ms": latency}
+
+
+def test_epoch_schedule():
+    assert epoch_schedule(1, 9, 3) == [1, 3, 9]
+    assert epoch_schedule(1, 10, 3) == [1, 3, 9, 10]  # 最后一轮截到 max_epochs
+    assert epoch_schedule(2, 5, 2) == [2, 4, 5]
+    assert epoch_schedule(3, 3, 3) == [3]
+    with pytest.raises(ValueError):
+        epoch_schedule(0, 9, 3)
+    with pytest.raises(ValueError):
+        epoch_schedule(1, 9, 1)
+
+
+def test_pareto_ranks():
+    trials = [
+        trial(0, 0.99, 5.0),
+        trial(1, 0.97, 1.0),
+        trial(2, 0.98, 5.0),  # 被 0 支配
+        trial(3, 0.96, 2.0),  # 被 1 支配
+        trial(4, 0.95, 6.0),  # 被 0、1、2、3 支配
+        trial(5, 0.97, 1.0),  # 与 1 完全相同，互不支配
+    ]
+    assert {t["trial"] for t in pareto_front(trials)} == {0, 1, 5}
+    assert pareto_ranks(trials) == {0: 0, 1: 0, 5: 0, 2: 1, 3: 1, 4: 2}
+    assert pareto_ranks([]) == {}
+
+
+def test_report_only_compares_finished_trials():
+    def full(id, accuracy, latency, status, epochs):
+        return {**trial(id, accuracy, latency), "status": status, "epochs": epochs, "params": 1000,
+                "train_time": 1.0, "config": {"units": 32, "layers": 1, "dense_units": 32, "dropout": 0.0}}
+
+    trials = [
+        full(0, 0.90, 0.5, "pruned", 1),  # 训练不足但延迟最低，不能进入前沿
+        full(1, 0.98, 2.0, "finished", 9),
+        full(2, 0.97, 1.0, "finished", 9),
+        full(3, 0.95, 0.8, "slo", 0),
+    ]
+    front = report(trials, slo=1.5)
+    assert [t["trial"] for t in front] == [2, 1]
+
+
+def test_sample_configs_are_distinct_and_reproducible():
+    configs = sample_configs(10, seed=1)
+    assert configs == sample_configs(10, seed=1)
+    assert len({tuple(config.values()) for config in configs}) == 10
+    total = 1
+    for values in SEARCH_SPACE.values():
+        total *= len(values)
+    assert len(sample_configs(10 ** 6, seed=0)) == total
+
+
+def test_search_refuses_non_empty_directory(tmp_path):
+    (tmp_path / "trials.jsonl").write_text("{}\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        search(SimpleNamespace(search_dir=str(tmp_path)), "run")
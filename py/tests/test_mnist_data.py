@@ -0,0 +1,73 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import mnist_data
+
+
+@pytest.fixture
+def source(tmp_path):
+    rng = np.random.default_rng(0)
+    arrays = {
+        "x_train": rng.integers(0, 256, (12, 28, 28), dtype=np.uint8),
+        "y_train": rng.integers(0, 10, 12, dtype=np.uint8),
+        "x_test": rng.integers(0, 256, (5, 28, 28), dtype=np.uint8),
+        "y_test": rng.integers(0, 10, 5, dtype=np.uint8),
+    }
+    path = str(tmp_path / "mnist.npz")
+    np.savez(path, **arrays)
+    return path, arrays
+
+
+def test_cache_round_trip(source, tmp_path):
+    path, arrays = source
+    directory = str(tmp_path / "cache")
+    (x_train, y_train), (x_test, y_test) = mnist_data.load(directory, path)
+    for name, array in zip(mnist_data.ARRAYS, (x_train, y_train, x_test, y_test)):
+        np.testing.assert_array_equal(array, arrays[name])
+        assert isinstance(array, np.memmap) and not array.flags.writeable
+    assert not [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+    # 缓存已存在时不再读取源文件
+    os.remove(path)
+    (x_train, _), _ = mnist_data.load(directory, path, full_check=True)
+    np.testing.assert_array_equal(x_train, arrays["x_train"])
+
+
+def test_verify_detects_damaged_cache(source, tmp_path):
+    path, _ = source
+    directory = str(tmp_path / "cache")
+    mnist_data.convert(directory, path)
+    target = os.path.join(directory, "y_test.npy")
+    with open(target, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 1]))
+    mnist_data.verify(directory)  # 大小没变，快速校验发现不了
+    with pytest.raises(ValueError, match="校验和"):
+        mnist_data.verify(directory, full=True)
+
+    with open(target, "ab") as f:
+        f.write(b"\0")
+    with pytest.raises(ValueError, match="大小"):
+        mnist_data.load(directory)
+
+
+def test_inconsistent_shapes_rejected(source, tmp_path):
+    path, arrays = source
+    np.savez(path, **dict(arrays, y_train=arrays["y_train"][:-1]))
+    with pytest.raises(ValueError, match="形状"):
+        mnist_data.convert(str(tmp_path / "cache"), path)
+
+
+def test_missing_manifest(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        mnist_data.verify(str(tmp_path))
+    manifest = {name: {"shape": [1], "size": 0, "sha256": ""} for name in mnist_data.ARRAYS}
+    with open(tmp_path / mnist_data.MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    with pytest.raises(ValueError):
+        mnist_data.verify(str(tmp_path))
@@ -0,0 +1,63 @@
+from spawn import ObjectPool, SpawnScheduler
+
+
+def drain(scheduler, ticks):
+    events = []
+    for tick in range(ticks):
+        due = scheduler.pop_due(tick)
+        assert all(event.tick <= tick for event in due)
+        events.extend(due)
+    return events
+
+
+def test_events_come_out_in_tick_order():
+    scheduler = SpawnScheduler("hard", 800, 600, seed=3, batch_size=4)
+    events = drain(scheduler, 5000)
+    ticks = [event.tick for event in events]
+    assert ticks == sorted(ticks)
+    # 批量很小时也会不断补充，不会断档
+    assert len({event.tick for event in events}) > 100
+
+
+def test_powerup_follows_its_wave_within_same_tick():
+    scheduler = SpawnScheduler("medium", 800, 600, seed=0)
+    events = drain(scheduler, 20000)
+    assert any(event.kind == "powerup" for event in events)
+    for previous, event in zip(events, events[1:]):
+        if event.kind == "powerup":
+            # 道具与同一周期的水果/炸弹同帧，且排在其后
+            assert previous.tick == event.tick and previous.kind != "powerup"
+
+
+def test_same_seed_same_schedule():
+    first = drain(SpawnScheduler("easy", 800, 600, seed=7), 3000)
+    second = drain(SpawnScheduler("easy", 800, 600, seed=7), 3000)
+    assert first == second
+
+
+def test_difficulty_curve():
+    scheduler = SpawnScheduler("medium", 800, 600, seed=0, overrides={"spawn_delay": 21})
+    events = [event for event in drain(scheduler, 20000) if event.kind != "powerup"]
+    gaps = [b.tick - a.tick for a, b in zip(events, events[1:])]
+    assert gaps[0] == 21
+    assert min(gaps) == 15  # 不低于 MIN_SPAWN_DELAY
+    assert events[-1].level > events[0].level
+
+
+def test_pool_reuses_released_objects():
+    created = []
+
+    def factory():
+        created.append(object())
+        return created[-1]
+
+    pool = ObjectPool(factory)
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(created) == 2
+    pool.release(second)
+    pool.release(first)
+    assert {pool.acquire(), pool.acquire()} == {first, second}
+    assert len(created) == 2
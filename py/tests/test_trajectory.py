@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+
+from trajectory import Trajectory, TrajectoryService
+
+
+def integrate(x, y, vx, vy, accel, scale, frames):
+    """与游戏每帧的积分相同：y += vy * s; x += vx * s; vy += g"""
+    for _ in range(frames):
+        y += vy * scale
+        x += vx * scale
+        vy += accel
+    return x, y
+
+
+@pytest.mark.parametrize("scale, accel", [(1.0, 0.27), (0.8, 0.24), (0.9, 0.0)])
+def test_position_matches_frame_by_frame_integration(scale, accel):
+    trajectory = Trajectory(100, 400.0, 600.0, 1.5, -12.0, accel, scale)
+    for k in range(0, 120, 7):
+        expected = integrate(400.0, 600.0, 1.5, -12.0, accel, scale, k)
+        assert trajectory.position(100 + k) == pytest.approx(expected)
+
+
+def test_position_holds_during_freeze_delay():
+    trajectory = Trajectory(10, 200.0, 500.0, 2.0, -10.0, 0.3, 1.0, delay=30)
+    for tick in (0, 10, 25, 40):
+        assert trajectory.position(tick) == (200.0, 500.0)
+    assert trajectory.position(45) == pytest.approx(integrate(200.0, 500.0, 2.0, -10.0, 0.3, 1.0, 5))
+
+
+def test_first_tick_in_matches_brute_force():
+    trajectory = Trajectory(0, 100.0, 600.0, 3.0, -14.0, 0.3, 0.9, delay=4)
+    region = (150.0, 300.0, 250.0, 400.0)
+    for start in (0, 3, 10, 30):
+        expected = None
+        for tick in range(start + 1, start + 121):
+            x, y = trajectory.position(tick)
+            if region[0] <= x <= region[2] and region[1] <= y <= region[3]:
+                expected = tick
+                break
+        assert trajectory.first_tick_in(region, start, 120) == expected
+    # 永远到不了的区域
+    assert trajectory.first_tick_in((700.0, 0.0, 800.0, 100.0), 0, 500) is None
+
+
+def test_service_delay_follows_game_freeze():
+    # 游戏每帧先把 freeze_time 减一，减到 0 的那一帧物体才恢复移动
+    entity = SimpleNamespace(x=300.0, y=550.0, speed_x=-1.0, speed_y=-11.0, gravity=0.3, sliced=False)
+    game = SimpleNamespace(tick=50, freeze_time=20, weather_system=SimpleNamespace(speed=0.8, gravity=0.8))
+    service = TrajectoryService(game)
+    predicted = {ahead: service.position(entity, ahead) for ahead in range(1, 60)}
+
+    x, y, vy = entity.x, entity.y, entity.speed_y
+    for ahead in range(1, 60):
+        game.freeze_time = max(game.freeze_time - 1, 0)
+        if game.freeze_time == 0:
+            y += vy * 0.8
+            x += entity.speed_x * 0.8
+            vy += entity.gravity * 0.8
+        assert predicted[ahead] == pytest.approx((x, y))
+
+
+def test_service_ticks_until_exit_and_invalidate():
+    entity = SimpleNamespace(x=300.0, y=500.0, speed_x=0.0, speed_y=-5.0, gravity=0.5, sliced=False)
+    game = SimpleNamespace(tick=0, freeze_time=0, weather_system=SimpleNamespace(speed=1.0, gravity=1.0))
+    service = TrajectoryService(game)
+    ticks = service.ticks_until_exit(entity, 600.0, 1000)
+    assert service.position(entity, ticks)[1] >= 600.0 > service.position(entity, ticks - 1)[1]
+    assert service.ticks_until_exit(entity, 600.0, 5) == 5
+
+    # 天气变化后必须失效，否则仍按旧的修正预测
+    game.weather_system.speed = 0.5
+    assert service.position(entity, 10) == pytest.approx(integrate(300.0, 500.0, 0.0, -5.0, 0.5, 1.0, 10))
+    service.invalidate()
+    assert service.position(entity, 10) == pytest.approx(integrate(300.0, 500.0, 0.0, -5.0, 0.5, 0.5, 10))
@@ -0,0 +1,61 @@
+import pytest
+
+from weather import WEATHER_STATES, WeatherSystem
+
+
+def run(weather, ticks):
+    changes = []
+    weather.subscribe(lambda old, new: changes.append((weather.changed_tick, old, new)))
+    for tick in range(ticks):
+        weather.update(tick)
+    return changes
+
+
+def test_switches_every_duration_to_a_different_state():
+    weather = WeatherSystem(100, 20, seed=1)
+    changes = run(weather, 1001)
+    assert [tick for tick, _, _ in changes] == list(range(100, 1001, 100))
+    state = "sunny"
+    for _, old, new in changes:
+        assert old == state and new != old
+        state = new
+    assert weather.state == state
+
+
+def test_physics_constants_follow_state():
+    weather = WeatherSystem(10, 5, initial="snowy", seed=0)
+    assert (weather.speed, weather.gravity, weather.accuracy) == tuple(WEATHER_STATES["snowy"].values())
+    weather.update(10)
+    effect = WEATHER_STATES[weather.state]
+    assert (weather.speed, weather.gravity, weather.accuracy) == (effect["speed"], effect["gravity"],
+                                                                   effect["accuracy"])
+
+
+def test_same_seed_same_sequence():
+    assert run(WeatherSystem(50, 10, seed=5), 2000) == run(WeatherSystem(50, 10, seed=5), 2000)
+
+
+def test_transition_progress():
+    weather = WeatherSystem(100, 20, start_tick=0, seed=0)
+    assert weather.transition_progress(5) is None  # 开局没有过渡
+    weather.update(100)
+    assert weather.transition_progress(100) == 0
+    assert weather.transition_progress(110) == pytest.approx(0.5)
+    assert weather.transition_progress(120) is None
+
+
+def test_game_emits_weather_events():
+    # 天气变化经事件总线在帧末交给成就系统
+    import fruit6
+    from events import WeatherEvent
+
+    game = fruit6.Game()
+    received = []
+    game.events.subscribe(WeatherEvent, received.extend)
+    game.tick = game.weather_system.next_change
+    old = game.weather
+    game.update_weather()
+    assert received == []
+    game.events.dispatch()
+    assert received == [WeatherEvent(game.tick, old, game.weather)]
+    assert game.weather != old and "weather_history" in game.achievements
@@ -0,0 +1,121 @@
+import pygame
+
+
+# 刀光拖尾：用固定大小的环形缓冲区保存最近 capacity 个刀锋位置及其帧号
+# 碰撞检测直接读取缓冲区中最新的一段（last_segment），绘制时沿各段盖上预先渲染的笔刷：
+# 越靠近刀尖越粗（渐细），越早的点越透明（淡出）
+class BladeTrail:
+    def __init__(self, capacity=16, lifetime=12, max_radius=6, color=(255, 255, 255),
+                 width_levels=6, alpha_levels=6, max_stamps=256):
+        """
+        capacity: 缓冲区保存的点数
+        lifetime: 点保留的帧数，超过后不再绘制
+        max_radius: 刀尖处笔刷半径
+        width_levels / alpha_levels: 预渲染笔刷的粗细和透明度档位数
+        max_stamps: 每帧最多盖的笔刷数
+        """
+        self.capacity = capacity
+        self.lifetime = lifetime
+        self.xs = [0.0] * capacity
+        self.ys = [0.0] * capacity
+        self.ticks = [0] * capacity
+        self.joined = [False] * capacity  # 该点是否与前一个点属于同一刀
+        self.head = capacity - 1  # 最新点的下标
+        self.count = 0
+        self.connected = False  # 下一个点是否接在当前最新点后面
+
+        # 预渲染笔刷：brushes[粗细档][透明度档]
+        self.brushes = []
+        self.radii = []
+        for w in range(width_levels):
+            radius = max(1, round(max_radius * (w + 1) / width_levels))
+            self.radii.append(radius)
+            row = []
+            for a in range(alpha_levels):
+                brush = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(brush, (*color, 255 * (a + 1) // alpha_levels), (radius, radius), radius)
+                row.append(brush)
+            self.brushes.append(row)
+
+        # 复用的 blits 参数（每帧只修改其中的值）；active 是本帧用到的前 n 项，原地伸缩，不每帧新建列表
+        self.stamps = [[None, [0, 0]] for _ in range(max_stamps)]
+        self.active = []
+
+    def add(self, x, y, tick):
+        head = (self.head + 1) % self.capacity
+        self.xs[head] = x
+        self.ys[head] = y
+        self.ticks[head] = tick
+        self.joined[head] = self.connected
+        self.head = head
+        self.count = min(self.count + 1, self.capacity)
+        self.connected = True
+
+    def add_stroke(self, start, end, tick):
+        """记录一帧的刀光轨迹；起点与上一个点不连续时另起一刀"""
+        head = self.head
+        if not self.connected or self.xs[head] != start[0] or self.ys[head] != start[1]:
+            self.connected = False
+            self.add(start[0], start[1], tick)
+        self.add(end[0], end[1], tick)
+
+    def break_stroke(self):
+        """本帧没有出刀，下一个点另起一刀"""
+        self.connected = False
+
+    def last_segment(self):
+        """最新一段轨迹 ((x1, y1), (x2, y2))，供碰撞检测使用"""
+        head = self.head
+        prev = (head - 1) % self.capacity
+        return (self.xs[prev], self.ys[prev]), (self.xs[head], self.ys[head])
+
+    def clear(self):
+        self.count = 0
+        self.connected = False
+
+    def draw(self, surface, tick, points=None):
+        """绘制最近 points 个点组成的拖尾"""
+        points = min(points or self.capacity, self.count)
+        if points < 2:
+            return
+        xs, ys, ticks, joined = self.xs, self.ys, self.ticks, self.joined
+        brushes, radii, stamps = self.brushes, self.radii, self.stamps
+        top_w = len(radii) - 1
+        top_a = len(brushes[0]) - 1
+        lifetime = self.lifetime
+        capacity = self.capacity
+        max_stamps = len(stamps)
+        n = 0
+        index = self.head
+        for k in range(points - 1):
+            age = tick - ticks[index]
+            if age >= lifetime or n >= max_stamps:
+                break  # 更早的点只会更旧
+            prev = (index - 1) % capacity
+            if joined[index]:
+                x1, y1 = xs[index], ys[index]
+                dx, dy = xs[prev] - x1, ys[prev] - y1
+                # 粗细从刀尖向尾部线性递减，透明度按点的年龄递减
+                taper0 = 1 - k / (points - 1)
+                taper1 = 1 - (k + 1) / (points - 1)
+                alpha = min(top_a, int(top_a * (1 - age / lifetime) + 0.999))
+                steps = max(1, int(max(abs(dx), abs(dy)) / max(1, radii[int(top_w * taper0)] * 2 // 3)))  # 笔刷间距约为 2/3 半径
+                for j in range(steps):
+                    if n >= max_stamps:
+                        break
+                    f = j / steps
+                    w = int(top_w * (taper0 + (taper1 - taper0) * f))
+                    radius = radii[w]
+                    stamp = stamps[n]
+                    stamp[0] = brushes[w][alpha]
+                    dest = stamp[1]
+                    dest[0] = int(x1 + dx * f) - radius
+                    dest[1] = int(y1 + dy * f) - radius
+                    n += 1
+            index = prev
+        if n:
+            active = self.active
+            while len(active) < n:
+                active.append(stamps[len(active)])
+            del active[n:]
+            surface.blits(active, doreturn=False)
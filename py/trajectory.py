@@ -0,0 +1,134 @@
+import math
+
+
+# 物体的弹道轨迹（闭式解）
+# 游戏每帧的积分为：y += vy * s; x += vx * s; vy += g
+# 因此第 k 帧后：x = x0 + s*vx*k，y = y0 + s*(vy*k + g*k*(k-1)/2)
+# （未考虑最大速度限制，物体在达到限速前早已落出屏幕）
+class Trajectory:
+    __slots__ = ("tick0", "x0", "y0", "vx", "vy", "accel", "scale", "delay")
+
+    def __init__(self, tick0, x0, y0, vx, vy, accel, scale, delay=0):
+        """delay: 冻结剩余帧数，期间物体不动"""
+        self.tick0 = tick0
+        self.x0 = x0
+        self.y0 = y0
+        self.vx = vx
+        self.vy = vy
+        self.accel = accel
+        self.scale = scale
+        self.delay = delay
+
+    def position(self, tick):
+        """第 tick 帧更新后的位置"""
+        k = tick - self.tick0 - self.delay
+        if k <= 0:
+            return self.x0, self.y0
+        s = self.scale
+        return self.x0 + s * self.vx * k, self.y0 + s * (self.vy * k + self.accel * k * (k - 1) / 2)
+
+    def first_tick_in(self, region, tick, ticks):
+        """物体在 (tick, tick + ticks] 内首次位于 region=(x1, y1, x2, y2) 的帧，不会进入时返回 None"""
+        x1, y1, x2, y2 = region
+        offset = tick - self.tick0 - self.delay  # 当前帧对应的运动帧数（冻结期间为负）
+        first = offset + 1
+        last = offset + ticks
+        if first <= 0:
+            # 冻结期间位置不变
+            if x1 <= self.x0 <= x2 and y1 <= self.y0 <= y2:
+                return tick + 1
+            first = 1
+        s = self.scale
+
+        x_range = _linear_range(self.x0, s * self.vx, x1, x2)
+        if x_range is None:
+            return None
+        a = s * self.accel / 2
+        b = s * self.vy - a
+        for lo, hi in _quadratic_ranges(a, b, self.y0, y1, y2):
+            lo = max(lo, x_range[0], first)
+            hi = min(hi, x_range[1], last)
+            k = math.ceil(lo - 1e-9)
+            if k <= hi + 1e-9:
+                return self.tick0 + self.delay + k
+        return None
+
+
+def _linear_range(p0, v, lo, hi):
+    """p0 + v*k 位于 [lo, hi] 的 k 区间"""
+    if v == 0:
+        return (-math.inf, math.inf) if lo <= p0 <= hi else None
+    k1 = (lo - p0) / v
+    k2 = (hi - p0) / v
+    return (k1, k2) if k1 <= k2 else (k2, k1)
+
+
+def _quadratic_ranges(a, b, c, lo, hi):
+    """a*k^2 + b*k + c 位于 [lo, hi] 的 k 区间列表（a >= 0）"""
+    if a == 0:
+        r = _linear_range(c, b, lo, hi)
+        return [r] if r else []
+
+    # 不超过 hi：两根之间
+    disc = b * b - 4 * a * (c - hi)
+    if disc < 0:
+        return []
+    root = math.sqrt(disc)
+    r1 = (-b - root) / (2 * a)
+    r2 = (-b + root) / (2 * a)
+
+    # 不低于 lo：两根之外
+    disc = b * b - 4 * a * (c - lo)
+    if disc < 0:
+        return [(r1, r2)]
+    root = math.sqrt(disc)
+    q1 = (-b - root) / (2 * a)
+    q2 = (-b + root) / (2 * a)
+    return [(r1, min(r2, q1)), (max(r1, q2), r2)]
+
+
+# 轨迹服务：缓存每个物体的轨迹，在天气变化、冻结开始时整体失效
+class TrajectoryService:
+    def __init__(self, game):
+        self.game = game
+        self.cache = {}  # id(物体) -> 轨迹
+
+    def invalidate(self):
+        self.cache.clear()
+
+    def forget(self, entity):
+        """物体重新发射（对象池复用）时调用"""
+        self.cache.pop(id(entity), None)
+
+    def get(self, entity):
+        trajectory = self.cache.get(id(entity))
+        if trajectory is None:
+            game = self.game
+            weather = game.weather_system
+            # 冻结剩余 n 帧时，物体从第 n 帧起才重新开始移动
+            delay = max(game.freeze_time - 1, 0)
+            trajectory = Trajectory(game.tick, entity.x, entity.y, entity.speed_x, entity.speed_y,
+                                    entity.gravity * weather.gravity, weather.speed, delay)
+            self.cache[id(entity)] = trajectory
+        return trajectory
+
+    def position(self, entity, ticks_ahead):
+        """物体 ticks_ahead 帧之后的位置"""
+        return self.get(entity).position(self.game.tick + ticks_ahead)
+
+    def ticks_until_exit(self, entity, bottom, horizon):
+        """物体还有多少帧落到 bottom 以下（horizon 帧内不会落下时返回 horizon）"""
+        hit = self.get(entity).first_tick_in((-math.inf, bottom, math.inf, math.inf), self.game.tick, horizon)
+        return horizon if hit is None else hit - self.game.tick
+
+    def entities_in_region(self, entities, region, ticks):
+        """返回未来 ticks 帧内会进入 region=(x1, y1, x2, y2) 的物体及其首次进入的帧"""
+        tick = self.game.tick
+        result = []
+        for entity in entities:
+            if getattr(entity, "sliced", False):
+                continue
+            hit = self.get(entity).first_tick_in(region, tick, ticks)
+            if hit is not None:
+                result.append((entity, hit))
+        return result
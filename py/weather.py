@@ -0,0 +1,60 @@
+import random
+
+# 各天气的物理修正（常量，在物理积分时直接使用）
+# speed: 位移速度倍率  gravity: 重力倍率  accuracy: 切割判定半径倍率
+WEATHER_STATES = {
+    "sunny": {"speed": 1.0, "gravity": 0.9, "accuracy": 1.0},
+    "rainy": {"speed": 0.9, "gravity": 1.0, "accuracy": 0.8},
+    "snowy": {"speed": 0.8, "gravity": 0.8, "accuracy": 0.7}
+}
+
+
+# 天气状态机：按模拟帧切换天气，切换时通知监听者
+class WeatherSystem:
+    def __init__(self, duration, transition_ticks, initial="sunny", seed=None, start_tick=0):
+        """
+        duration: 每种天气持续的帧数
+        transition_ticks: 切换时背景淡入过渡的帧数
+        """
+        self.duration = duration
+        self.transition_ticks = transition_ticks
+        self.rng = random.Random(seed)
+        self.listeners = []
+
+        self.previous = None
+        self.changed_tick = start_tick
+        self.next_change = start_tick + duration
+        self.set_state(initial)
+
+    def subscribe(self, callback):
+        """注册天气变化回调 callback(old, new)"""
+        self.listeners.append(callback)
+
+    def set_state(self, state):
+        self.state = state
+        effect = WEATHER_STATES[state]
+        self.speed = effect["speed"]
+        self.gravity = effect["gravity"]
+        self.accuracy = effect["accuracy"]
+
+    def update(self, tick):
+        """每帧调用一次，到达切换时间时换成另一种天气"""
+        if tick < self.next_change:
+            return
+        old = self.state
+        new = self.rng.choice([state for state in WEATHER_STATES if state != old])
+        self.previous = old
+        self.changed_tick = tick
+        self.next_change = tick + self.duration
+        self.set_state(new)
+        for callback in self.listeners:
+            callback(old, new)
+
+    def transition_progress(self, tick):
+        """返回过渡进度（0~1），不在过渡中时返回 None"""
+        if self.previous is None:
+            return None
+        elapsed = tick - self.changed_tick
+        if elapsed >= self.transition_ticks:
+            return None
+        return elapsed / self.transition_ticks